@@ -3,6 +3,7 @@ In-memory log handler — captures all application logs into a ring buffer
 so they can be streamed to the admin dashboard in real time.
 """
 
+import asyncio
 import logging
 from collections import deque
 from datetime import datetime
@@ -39,6 +40,8 @@ class InMemoryLogHandler(logging.Handler):
         self.records: deque[LogRecord] = deque(maxlen=max_records)
         self._lock = Lock()
         self._counter = 0  # monotonic counter for polling
+        # Events of live log streams, set (on their own loop) on every new record
+        self._listeners: dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
 
     def emit(self, record: logging.LogRecord):
         try:
@@ -51,9 +54,25 @@ class InMemoryLogHandler(logging.Handler):
             with self._lock:
                 self._counter += 1
                 self.records.append(entry)
+                listeners = list(self._listeners.items())
+            # Records may come from worker threads — wake streams thread-safely
+            for event, loop in listeners:
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    pass  # loop already closed
         except Exception:
             self.handleError(record)
 
+    def add_listener(self, event: asyncio.Event) -> None:
+        """Have event set whenever a record arrives (call from the event loop)."""
+        with self._lock:
+            self._listeners[event] = asyncio.get_running_loop()
+
+    def remove_listener(self, event: asyncio.Event) -> None:
+        with self._lock:
+            self._listeners.pop(event, None)
+
     def get_logs(self, after: int = 0, limit: int = 200) -> tuple[list[dict], int]:
         """
         Get log records after a given counter position.
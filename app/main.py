@@ -13,11 +13,13 @@ from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import Update
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings, OUTPUT_DIR
 from app.bot.handlers import router as bot_router
-from app.web.routes import router as web_router
+from app.web.routes import precompile_templates, router as web_router
 
 # ── Logging ────────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -60,6 +62,13 @@ async def lifespan(app: FastAPI):
         logger.info("Starting Telegram bot in polling mode...")
         polling_task = asyncio.create_task(_start_polling())
 
+    # Compile page templates before serving
+    precompile_templates()
+
+    # Import yt-dlp/Instaloader now so the first URL request doesn't pay for it
+    from app.services.content_extractor import preload_downloaders
+    await asyncio.to_thread(preload_downloaders)
+
     # Start cron scheduler
     from app.scheduler import start_scheduler, stop_scheduler
     start_scheduler()
@@ -73,6 +82,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     stop_scheduler()
+    from app.services.http_client import close_http_client
+    from app.services.reddit_scraper import close_session as close_reddit_session
+    await close_http_client()
+    await close_reddit_session()
     if bot:
         if settings.bot_mode == "webhook":
             await bot.delete_webhook()
@@ -93,13 +106,48 @@ app = FastAPI(
     title="YouTube Shorts Generator",
     description="AI-powered YouTube Shorts automation",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+class APIGZipMiddleware(GZipMiddleware):
+    """
+    Gzip the JSON API (settings, logs, channels are the big admin payloads).
+    Pages and /output videos are left alone: MP4s don't shrink, and
+    compression would break their range requests. The log event stream is
+    skipped too, since gzip would hold events back until its buffer fills.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["path"].startswith("/api/")
+            and scope["path"] != "/api/logs/stream"
+        ):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(APIGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Web routes
 app.include_router(web_router)
 
+class OutputFiles(StaticFiles):
+    """
+    StaticFiles already sends ETag/Last-Modified and answers conditional
+    requests with 304. Output videos get a unique name per render and are
+    never rewritten, so browsers may also cache them outright.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=86400, immutable")
+        return response
+
+
 # Serve generated videos at /output/
-app.mount("/output", StaticFiles(directory=str(OUTPUT_DIR)), name="output")
+app.mount("/output", OutputFiles(directory=str(OUTPUT_DIR)), name="output")
 
 
 # Telegram webhook endpoint
@@ -109,7 +157,6 @@ async def telegram_webhook(request: Request):
     if not bot or not dp:
         return {"ok": False, "error": "Bot not configured"}
 
-    data = await request.json()
-    update = Update.model_validate(data, context={"bot": bot})
+    update = Update.model_validate_json(await request.body(), context={"bot": bot})
     await dp.feed_update(bot=bot, update=update)
     return {"ok": True}
@@ -181,7 +181,7 @@ async def generate_video(
 
         # ── Step 7: Assemble video ─────────────────────────────────────
         await _progress("🎞️ Assembling the final video...")
-        video_path = assemble_video(
+        video_path = await assemble_video(
             card_image_bytes=card_bytes,
             background_video_path=bg_video_path,
             music_path=music_path,
@@ -66,15 +66,17 @@ def _sync_jobs(sched: AsyncIOScheduler):
         if job_id.startswith("cron_"):
             sched.remove_job(job_id)
 
-    # Add enabled jobs
-    jobs = settings_store.list_cron_jobs()
-    for job in jobs:
+    # Add enabled jobs — jobs firing at the same time share one scheduler
+    # entry, so their AI idea generation can go out as a single Gemini call
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for job in settings_store.list_cron_jobs():
         if not job.get("enabled", False):
             continue
+        key = (job.get("schedule_time", "09:00"), job.get("timezone", "Africa/Cairo"))
+        groups.setdefault(key, []).append(job)
 
-        job_id = f"cron_{job['id']}"
-        schedule_time = job.get("schedule_time", "09:00")
-        timezone = job.get("timezone", "Africa/Cairo")
+    for (schedule_time, timezone), group in groups.items():
+        job_id = "cron_" + "+".join(str(job["id"]) for job in group)
 
         try:
             hour, minute = schedule_time.split(":")
@@ -84,19 +86,56 @@ def _sync_jobs(sched: AsyncIOScheduler):
                 timezone=timezone,
             )
             sched.add_job(
-                _run_cron_job,
+                _run_cron_jobs,
                 trigger=trigger,
                 id=job_id,
-                args=[job],
+                args=[group],
                 replace_existing=True,
             )
-            logger.info(f"Scheduled job {job_id}: {job['channel_slug']} at {schedule_time} {timezone}")
+            slugs = ", ".join(job["channel_slug"] for job in group)
+            logger.info(f"Scheduled job {job_id}: {slugs} at {schedule_time} {timezone}")
         except Exception as e:
             logger.error(f"Failed to schedule job {job_id}: {e}")
 
 
-async def _run_cron_job(job_config: dict):
-    """Execute a cron job: generate ideas and send to Telegram."""
+async def _run_cron_jobs(job_configs: list[dict]):
+    """Execute cron jobs that fire together, batching their AI idea generation."""
+    from app.services.idea_generator import generate_ideas_batch
+
+    # One Gemini call for every AI-sourced job; a channel can only appear
+    # once in a batch, so repeat jobs for a channel generate on their own
+    batch: dict[str, dict] = {}
+    for job in job_configs:
+        if job.get("idea_source", "ai") in ("reddit", "csv") or not job.get("telegram_chat_id"):
+            continue
+        batch.setdefault(job["channel_slug"], job)
+
+    batched_ideas: dict[str, list] = {}
+    if len(batch) > 1:
+        requests = []
+        for slug, job in batch.items():
+            channel_data = settings_store.get_channel(slug)
+            desc = channel_data.get("description", "") if channel_data else ""
+            requests.append((slug, job.get("num_ideas", 10), desc))
+        batched_ideas = await generate_ideas_batch(requests)
+
+    runs = []
+    for job in job_configs:
+        slug = job["channel_slug"]
+        # Channels the batch came back empty for fall back to their own call
+        ideas = batched_ideas.get(slug) if batch.get(slug) is job else None
+        runs.append(_run_cron_job(job, ideas=ideas or None))
+
+    for job, result in zip(job_configs, await asyncio.gather(*runs, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error(f"Cron job {job['id']} failed: {result}")
+
+
+async def _run_cron_job(job_config: dict, ideas: Optional[list] = None):
+    """
+    Execute a cron job: generate ideas and send to Telegram.
+    `ideas` skips generation when they were already produced in a batch.
+    """
     from app.services.idea_generator import generate_ideas
 
     channel_slug = job_config["channel_slug"]
@@ -111,26 +150,29 @@ async def _run_cron_job(job_config: dict):
     channel_data = settings_store.get_channel(channel_slug)
     desc = channel_data.get("description", "") if channel_data else ""
 
-    logger.info(f"Cron job firing: {channel_slug}, generating {num_ideas} ideas using {job_config.get('idea_source', 'ai')}")
-
-    if job_config.get("idea_source") == "reddit":
-        from app.services.reddit_scraper import scrape_reddit_ideas
-        ideas = await scrape_reddit_ideas(
-            subreddits=job_config.get("subreddits", []),
-            count=num_ideas
-        )
-    elif job_config.get("idea_source") == "csv":
-        from app.services.csv_ideas import scrape_csv_ideas
-        ideas = await scrape_csv_ideas(
-            channel_slug=channel_slug,
-            count=num_ideas
-        )
+    if ideas:
+        logger.info(f"Cron job firing: {channel_slug}, {len(ideas)} ideas from a batched call")
     else:
-        ideas = await generate_ideas(
-            channel_slug=channel_slug,
-            count=num_ideas,
-            channel_description=desc,
-        )
+        logger.info(f"Cron job firing: {channel_slug}, generating {num_ideas} ideas using {job_config.get('idea_source', 'ai')}")
+
+        if job_config.get("idea_source") == "reddit":
+            from app.services.reddit_scraper import scrape_reddit_ideas
+            ideas = await scrape_reddit_ideas(
+                subreddits=job_config.get("subreddits", []),
+                count=num_ideas
+            )
+        elif job_config.get("idea_source") == "csv":
+            from app.services.csv_ideas import scrape_csv_ideas
+            ideas = await scrape_csv_ideas(
+                channel_slug=channel_slug,
+                count=num_ideas
+            )
+        else:
+            ideas = await generate_ideas(
+                channel_slug=channel_slug,
+                count=num_ideas,
+                channel_description=desc,
+            )
 
     if not ideas:
         logger.error(f"No ideas generated for cron job {channel_slug}")
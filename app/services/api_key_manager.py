@@ -6,15 +6,26 @@ Keys and cycling settings are loaded from settings_store.
 """
 
 import asyncio
+import hashlib
 import logging
+import os
 import threading
+import time
 from typing import Optional
 
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types as genai_types
 
 logger = logging.getLogger(__name__)
 
+# Explicit Gemini context caching for static prompt prefixes (opt-in:
+# cached content is billed for storage time and has a minimum token size)
+GEMINI_CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+GEMINI_CACHE_TTL = "3600s"
+# How long to send a prefix inline after a transient cache-create failure
+GEMINI_CACHE_RETRY_SECONDS = 300
+
 
 class KeyCycler:
     """
@@ -70,6 +81,13 @@ class APIKeyManager:
 
     def __init__(self):
         self._cyclers: dict[str, KeyCycler] = {}
+        # One Gemini client per key — each keeps its own pooled HTTP
+        # connections, so back-to-back calls reuse the TLS session.
+        self._gemini_clients: dict[str, genai.Client] = {}
+        # (key, model, prefix hash) -> cachedContents name; None = uncacheable
+        self._prompt_caches: dict[tuple[str, str, str], Optional[str]] = {}
+        # (key, model, prefix hash) -> monotonic time before which not to retry
+        self._prompt_cache_retry: dict[tuple[str, str, str], float] = {}
         self._load_from_store()
 
     def _load_from_store(self):
@@ -97,6 +115,17 @@ class APIKeyManager:
     def reload(self):
         """Reload keys from settings store (call after key changes)."""
         self._load_from_store()
+        # Drop clients for keys that were removed
+        active = set(self.get_cycler("gemini").get_all_keys())
+        for key in list(self._gemini_clients):
+            if key not in active:
+                del self._gemini_clients[key]
+        for cache_key in list(self._prompt_caches):
+            if cache_key[0] not in active:
+                del self._prompt_caches[cache_key]
+        for cache_key in list(self._prompt_cache_retry):
+            if cache_key[0] not in active:
+                del self._prompt_cache_retry[cache_key]
 
     def get_cycler(self, service: str) -> KeyCycler:
         """Get the key cycler for a service."""
@@ -110,15 +139,124 @@ class APIKeyManager:
 
     # ── Gemini helpers ─────────────────────────────────────────────────
 
+    def get_gemini_client(self, key: str) -> genai.Client:
+        """Get the cached Gemini client for a key, creating it on first use."""
+        client = self._gemini_clients.get(key)
+        if client is None:
+            client = genai.Client(api_key=key)
+            self._gemini_clients[key] = client
+        return client
+
+    async def _get_prompt_cache(
+        self, client: genai.Client, key: str, model: str, prefix: str,
+    ) -> Optional[str]:
+        """Get (or create) the cachedContents resource holding a static prefix."""
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        cache_key = (key, model, digest)
+        if cache_key in self._prompt_caches:
+            return self._prompt_caches[cache_key]
+        if time.monotonic() < self._prompt_cache_retry.get(cache_key, 0.0):
+            return None
+
+        try:
+            cache = await client.aio.caches.create(
+                model=model,
+                config=genai_types.CreateCachedContentConfig(
+                    system_instruction=prefix,
+                    display_name=f"prompt-{digest[:12]}",
+                    ttl=GEMINI_CACHE_TTL,
+                ),
+            )
+            name = cache.name
+            logger.info(f"Gemini prompt cache created: {name}")
+        except genai_errors.ClientError as e:
+            if e.code in (408, 429):
+                return self._defer_prompt_cache(cache_key, e)
+            # e.g. prefix below the model's minimum cacheable size or model
+            # without caching support — this will keep failing, don't retry
+            logger.warning(f"Gemini prompt caching unavailable, sending prefix inline: {e}")
+            name = None
+        except Exception as e:
+            # Network errors, 5xx — try again later
+            return self._defer_prompt_cache(cache_key, e)
+
+        self._prompt_cache_retry.pop(cache_key, None)
+        self._prompt_caches[cache_key] = name
+        return name
+
+    def _defer_prompt_cache(self, cache_key: tuple[str, str, str], error: Exception) -> None:
+        """Send the prefix inline for a while after a transient cache-create failure."""
+        logger.warning(
+            f"Gemini prompt cache create failed, retrying in {GEMINI_CACHE_RETRY_SECONDS}s: {error}"
+        )
+        self._prompt_cache_retry[cache_key] = time.monotonic() + GEMINI_CACHE_RETRY_SECONDS
+        return None
+
+    def _drop_prompt_cache(self, cache_name: str) -> None:
+        """Forget an expired cachedContents resource so it gets recreated."""
+        for cache_key, name in list(self._prompt_caches.items()):
+            if name == cache_name:
+                del self._prompt_caches[cache_key]
+
+    async def _generate_once(
+        self,
+        key: str,
+        model: str,
+        contents,
+        config: Optional[genai_types.GenerateContentConfig],
+        cached_prefix: Optional[str],
+        refresh_cache: bool = True,
+    ):
+        """Single Gemini call with one key, attaching the static prefix."""
+        client = self.get_gemini_client(key)
+
+        cache_name = None
+        if cached_prefix and GEMINI_CACHE_ENABLED:
+            cache_name = await self._get_prompt_cache(client, key, model, cached_prefix)
+
+        if cache_name:
+            update = {"cached_content": cache_name}
+            config = (config.model_copy(update=update) if config
+                      else genai_types.GenerateContentConfig(**update))
+        elif cached_prefix:
+            # No cache — send the static prefix inline, ahead of the dynamic part
+            if isinstance(contents, str):
+                contents = cached_prefix + contents
+            else:
+                contents = [cached_prefix, *contents]
+
+        kwargs = {"model": model, "contents": contents}
+        if config:
+            kwargs["config"] = config
+        try:
+            return await client.aio.models.generate_content(**kwargs)
+        except Exception as e:
+            error_str = str(e).lower()
+            if cache_name and refresh_cache and ("not found" in error_str or "404" in error_str or "expired" in error_str):
+                # Cache TTL expired server-side — recreate it once and retry
+                logger.info(f"Gemini prompt cache expired: {cache_name}")
+                self._drop_prompt_cache(cache_name)
+                config = config.model_copy(update={"cached_content": None})
+                return await self._generate_once(
+                    key, model, contents, config, cached_prefix, refresh_cache=False,
+                )
+            raise
+
     async def gemini_generate(
         self,
         model: str,
         contents,
         config: Optional[genai_types.GenerateContentConfig] = None,
         max_retries: int = 0,
+        cached_prefix: Optional[str] = None,
     ):
         """
         Generate content via Gemini with key cycling and auto-retry on rate limits.
+
+        cached_prefix is a static instruction block shared across calls. With
+        GEMINI_CACHE_ENABLED it is stored once as a Gemini cachedContents
+        resource (per key/model) and referenced; otherwise it is prepended to
+        contents as plain text.
         """
         cycler = self.get_cycler("gemini")
         all_keys = cycler.get_all_keys()
@@ -136,12 +274,7 @@ class APIKeyManager:
             key_preview = f"{key[:8]}..." if key and len(key) > 8 else "***"
 
             try:
-                client = genai.Client(api_key=key)
-                kwargs = {"model": model, "contents": contents}
-                if config:
-                    kwargs["config"] = config
-                response = await client.aio.models.generate_content(**kwargs)
-                return response
+                return await self._generate_once(key, model, contents, config, cached_prefix)
 
             except Exception as e:
                 error_str = str(e).lower()
@@ -28,17 +28,17 @@ from app.services.api_key_manager import get_key_manager
 logger = logging.getLogger(__name__)
 
 
+# Static instructions first, per-card values last: Gemini's implicit prefix
+# caching only discounts a prefix that is byte-identical across calls.
 CARD_EDIT_PROMPT = """You are editing a social media card template for a YouTube Shorts video.
 
 The FIRST image is the blank card template — it already has the channel's logo, name, and verified badge designed into it. There are empty areas where the fact text and a related image should go.
 
-{image_instruction}
-
 Your task: Edit the template to create the final card by:
-1. Add this fact title as a heading text on the card: "{title}"
-2. Add this fact body text below the title: "{body}"
+1. Add the fact title given below as a heading text on the card
+2. Add the fact body given below as text below the title
 3. Place the related image in the image area of the card (the lower portion)
-4. Add a small source attribution text in the lower-left corner of the card: "{source}"
+4. Add the source given below as small attribution text in the lower-left corner of the card
 
 Rules:
 - Keep the EXACT same visual style, colors, fonts, and layout of the original template
@@ -50,6 +50,13 @@ Rules:
 - Output the final edited card as a single image
 """
 
+CARD_EDIT_TAIL = """{image_instruction}
+
+Fact title: "{title}"
+Fact body: "{body}"
+Source: "{source}"
+"""
+
 
 async def build_card(
     channel: ChannelConfig,
@@ -85,15 +92,16 @@ async def build_card(
 
     source_text = image_source if image_source else "source: web"
 
-    prompt = CARD_EDIT_PROMPT.format(
+    prompt = CARD_EDIT_TAIL.format(
         title=title,
         body=body,
         image_instruction=image_instruction,
         source=source_text,
     )
 
-    # Build multimodal content parts
+    # Build multimodal content parts (static instructions lead)
     content_parts = [
+        CARD_EDIT_PROMPT,
         genai_types.Part.from_bytes(data=template_bytes, mime_type="image/png"),
     ]
 
@@ -178,7 +186,7 @@ def _compose_on_canvas(card_image_bytes: bytes) -> bytes:
 
     canvas.paste(card, (x, y), card)
 
-    # Export as PNG
+    # Export as PNG (intermediate frame for FFmpeg — fast, light compression)
     output = io.BytesIO()
-    canvas.save(output, format="PNG")
+    canvas.save(output, format="PNG", compress_level=1, optimize=False)
     return output.getvalue()
@@ -242,6 +242,7 @@ def _compose_on_canvas(card: Image.Image) -> bytes:
 
     canvas.paste(card, (x, y), card)
 
+    # Intermediate frame for FFmpeg — favour encode speed over file size
     output = io.BytesIO()
-    canvas.save(output, format="PNG")
+    canvas.save(output, format="PNG", compress_level=1, optimize=False)
     return output.getvalue()
@@ -3,7 +3,7 @@ SVG Template Card Builder — renders cards from Figma-exported SVG templates.
 
 Workflow:
 1. Load the channel's SVG template (assets/channels/<slug>/template.svg)
-2. Parse with xml.etree.ElementTree
+2. Parse with lxml
 3. Read the ORIGINAL positions of input_text, main_image, source from the template
 4. Inject dynamic content preserving the template's layout
 5. Recalculate SVG height based on text length
@@ -15,14 +15,18 @@ Handles Figma-exported SVG structures:
 - Images use <g> → <rect fill="url(#pattern)"> → <pattern> → <use>/<image> chains
 """
 
+import asyncio
 import base64
+import bisect
+import copy
+import functools
 import io
 import logging
 import re
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Optional
 
+from lxml import etree as ET
 from PIL import Image
 
 from app.config import (
@@ -51,28 +55,65 @@ MAX_IMAGE_HEIGHT_RATIO = 0.6    # Image can use at most 60% of card height
 SVG_NS = "http://www.w3.org/2000/svg"
 XLINK_NS = "http://www.w3.org/1999/xlink"
 
-# Register namespaces so ET.tostring doesn't mangle them
-ET.register_namespace("", SVG_NS)
-ET.register_namespace("xlink", XLINK_NS)
+# lxml keeps the template's own namespace prefixes on output. Comments/PIs
+# are dropped like ElementTree did, and huge_tree allows the multi-MB
+# base64 images Figma embeds in exported templates.
+_SVG_PARSER = ET.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True)
+_ID_XPATH = ET.XPath("//*[@id=$id]")
+
+# Tags compared against while walking the template, with or without the SVG
+# namespace, so no element's tag has to be split into its local name
+_TSPAN_TAGS = (f"{{{SVG_NS}}}tspan", "tspan")
+_G_TAGS = (f"{{{SVG_NS}}}g", "g")
+_RECT_TAGS = (f"{{{SVG_NS}}}rect", "rect")
+_USE_TAGS = (f"{{{SVG_NS}}}use", "use")
+_IMAGE_TAGS = (f"{{{SVG_NS}}}image", "image")
+
+# Precompiled patterns (used once or more per card)
+_FONT_SIZE_RE = re.compile(r"font-size:\s*(\d+)")
+_URL_ID_RE = re.compile(r"url\(#([^)]+)\)")
 
 
 # ── Utility helpers ───────────────────────────────────────────────────
 
 def _find_by_id(root: ET.Element, elem_id: str) -> Optional[ET.Element]:
     """Find any element by id= attribute, searching the full tree."""
-    for el in root.iter():
-        if el.get("id") == elem_id:
-            return el
-    return None
+    found = _ID_XPATH(root, id=elem_id)
+    return found[0] if found else None
+
+
+# Parsed templates: path -> (mtime_ns, root). Only the current version of each
+# template is kept — Figma exports embed multi-MB images, so superseded trees
+# shouldn't linger until evicted.
+_template_cache: dict[str, tuple[int, ET._Element]] = {}
+
+
+def _parse_template(svg_path: str, mtime_ns: int) -> ET._Element:
+    """
+    Parse a template once per file version (keyed by mtime). The returned
+    tree is shared — callers must deepcopy it before injecting content.
+    """
+    cached = _template_cache.get(svg_path)
+    if cached is None or cached[0] != mtime_ns:
+        root = ET.fromstring(Path(svg_path).read_bytes(), _SVG_PARSER)
+        cached = _template_cache[svg_path] = (mtime_ns, root)
+    return cached[1]
 
 
 def _get_float(elem: ET.Element, attr: str, default: float = 0) -> float:
     """Safely get a float attribute, stripping 'px' if present."""
-    val = elem.get(attr, "")
+    val = elem.get(attr)
     if not val:
         return default
+    if val[-2:] == "px":
+        val = val[:-2]
+    # Fast path: plain numbers parse directly without extra string copies
+    try:
+        return float(val)
+    except ValueError:
+        pass
     try:
-        return float(val.replace("px", "").strip())
+        return float(val.strip().removesuffix("px").strip())
     except ValueError:
         return default
 
@@ -92,33 +133,38 @@ def _svg_dims(root: ET.Element) -> tuple[float, float]:
     return w or 500, h or 800
 
 
-def _wrap_text(text: str, max_chars: int) -> list[str]:
-    """Word-wrap text into lines, each ≤ max_chars."""
+@functools.lru_cache(maxsize=1024)
+def _wrap_text(text: str, max_chars: int) -> tuple[str, ...]:
+    """Word-wrap text into lines, each ≤ max_chars (cached: layout passes rewrap the same body)."""
     words = text.split()
-    lines: list[str] = []
-    cur = ""
+    # cum[j] - cum[i] - 1 is the length of " ".join(words[i:j])
+    cum = [0]
     for w in words:
-        test = f"{cur} {w}".strip()
-        if len(test) <= max_chars:
-            cur = test
-        else:
-            if cur:
-                lines.append(cur)
-            cur = w
-    if cur:
-        lines.append(cur)
-    return lines or [""]
+        cum.append(cum[-1] + len(w) + 1)
 
+    lines: list[str] = []
+    i = 0
+    while i < len(words):
+        # Longest run of words starting at i that fits; an over-long word gets its own line
+        j = max(i + 1, bisect.bisect_right(cum, cum[i] + max_chars + 1) - 1)
+        lines.append(" ".join(words[i:j]))
+        i = j
+    return tuple(lines) or ("",)
 
-def _to_base64_uri(image_bytes: bytes) -> str:
-    """Convert raw image bytes into a data:image/...;base64,... URI."""
+
+def _to_base64_uri(image_bytes: bytes) -> bytes:
+    """
+    Convert raw image bytes into a data:image/...;base64,... URI. Kept as
+    ASCII bytes, which lxml takes as-is for attribute values, to skip a
+    decode copy of the (potentially multi-MB) encoded image.
+    """
     if image_bytes[:4] == b"\x89PNG":
-        mime = "image/png"
+        mime = b"image/png"
     elif image_bytes[:4] == b"RIFF":
-        mime = "image/webp"
+        mime = b"image/webp"
     else:
-        mime = "image/jpeg"
-    return f"data:{mime};base64,{base64.b64encode(image_bytes).decode()}"
+        mime = b"image/jpeg"
+    return b"data:" + mime + b";base64," + base64.b64encode(image_bytes)
 
 
 def _read_tspan_coords(text_el: ET.Element) -> tuple[float, float]:
@@ -128,8 +174,7 @@ def _read_tspan_coords(text_el: ET.Element) -> tuple[float, float]:
     """
     # Try the first <tspan> child first
     for child in text_el:
-        tag = child.tag
-        if isinstance(tag, str) and (tag.endswith("}tspan") or tag == "tspan"):
+        if child.tag in _TSPAN_TAGS:
             x = _get_float(child, "x", 0)
             y = _get_float(child, "y", 0)
             if x > 0 or y > 0:
@@ -168,19 +213,22 @@ def _compute_text_layout(
 def _inject_text(
     root: ET.Element, body: str, svg_width: float,
     font_size_override: float = 0,
+    el: Optional[ET.Element] = None,
 ) -> dict:
     """
     Replace the content of id="input_text" with word-wrapped <tspan> elements.
 
     If font_size_override > 0, use it instead of the template's font size.
-    This allows the orchestrator to shrink text dynamically.
+    This allows the orchestrator to shrink text dynamically. Pass el when the
+    input_text element has already been looked up.
 
     Returns a dict with:
       x, start_y  — the original position of the text element
       text_height  — total pixel height of the wrapped text block
       num_lines    — number of lines produced
     """
-    el = _find_by_id(root, "input_text")
+    if el is None:
+        el = _find_by_id(root, "input_text")
     if el is None:
         logger.warning("id='input_text' not found in SVG")
         return {"x": 24, "start_y": 120, "text_height": LINE_HEIGHT, "num_lines": 1}
@@ -193,7 +241,7 @@ def _inject_text(
     if not font_size_str:
         # Try style attribute
         style = el.get("style", "")
-        m = re.search(r"font-size:\s*(\d+)", style)
+        m = _FONT_SIZE_RE.search(style)
         font_size_str = m.group(1) if m else "22"
     template_font = float(font_size_str.replace("px", "").strip()) if font_size_str else 22
 
@@ -224,16 +272,14 @@ def _inject_text(
         el.remove(child)
 
     # Wrap and create <tspan> elements
+    # (attributes are passed at creation; x/dy strings are the same on every line)
     lines = _wrap_text(body, chars_per_line)
+    x_attr = str(orig_x)
+    follow_attrs = {"x": x_attr, "dy": str(line_height)}
     for i, line in enumerate(lines):
-        tspan = ET.SubElement(el, f"{{{SVG_NS}}}tspan")
-        tspan.set("x", str(orig_x))
-        if i == 0:
-            # First line stays at the original y
-            tspan.set("y", str(orig_y))
-        else:
-            tspan.set("dy", str(line_height))
-        tspan.text = line
+        # First line stays at the original y
+        attrs = {"x": x_attr, "y": str(orig_y)} if i == 0 else follow_attrs
+        ET.SubElement(el, _TSPAN_TAGS[0], attrs).text = line
 
     text_height = len(lines) * line_height
     logger.info(f"SVG text wrapped: {len(lines)} lines, {text_height:.0f}px total")
@@ -253,11 +299,15 @@ def _inject_image(
     image_bytes: Optional[bytes],
     new_y: float,
     svg_width: float,
+    data_uri: Optional[bytes] = None,
 ) -> dict:
     """
     Replace the image inside id="main_image" with a base64 data URI.
     Reposition the image rect to new_y.
 
+    The (potentially multi-MB) data URI is built once — pass a precomputed
+    data_uri to reuse it; otherwise it is derived from image_bytes here.
+
     Handles Figma's pattern-based structure:
       <g id="main_image">
         <rect x="..." y="..." width="..." height="..." fill="url(#patternId)" />
@@ -278,14 +328,15 @@ def _inject_image(
         return {"img_width": svg_width * 0.9, "img_height": DEFAULT_IMAGE_HEIGHT,
                 "img_x": svg_width * 0.05, "img_y": new_y}
 
-    tag_local = el.tag.split("}")[-1] if "}" in el.tag else el.tag
+    if image_bytes and data_uri is None:
+        data_uri = _to_base64_uri(image_bytes)
 
-    if tag_local == "g":
+    if el.tag in _G_TAGS:
         # ── Figma pattern-based structure ──
-        return _inject_image_figma_group(root, el, image_bytes, new_y, svg_width)
+        return _inject_image_figma_group(root, el, image_bytes, new_y, svg_width, data_uri)
     else:
         # ── Simple <image> element ──
-        return _inject_image_simple(el, image_bytes, new_y, svg_width)
+        return _inject_image_simple(el, image_bytes, new_y, svg_width, data_uri)
 
 
 def _inject_image_figma_group(
@@ -294,13 +345,13 @@ def _inject_image_figma_group(
     image_bytes: Optional[bytes],
     new_y: float,
     svg_width: float,
+    data_uri: Optional[bytes] = None,
 ) -> dict:
     """Handle Figma's <g> → <rect fill=url(#pattern)> → <pattern> → <image> chain."""
     # Find the <rect> child of the group
     rect_el = None
     for child in group_el:
-        child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-        if child_tag == "rect":
+        if child.tag in _RECT_TAGS:
             rect_el = child
             break
 
@@ -331,17 +382,20 @@ def _inject_image_figma_group(
         # Update rect height to match proportional image
         rect_el.set("height", str(img_h))
 
+        if data_uri is None:
+            data_uri = _to_base64_uri(image_bytes)
+
         # Extract the pattern ID from fill="url(#patternId)"
         fill_attr = rect_el.get("fill", "")
-        pattern_match = re.search(r"url\(#([^)]+)\)", fill_attr)
+        pattern_match = _URL_ID_RE.search(fill_attr)
 
         if pattern_match:
             pattern_id = pattern_match.group(1)
-            _replace_pattern_image(root, pattern_id, image_bytes, img_w, img_h)
+            _replace_pattern_image(root, pattern_id, image_bytes, data_uri, img_w, img_h)
         else:
             # No pattern fill — convert the rect+group into a direct <image>
             logger.info("No pattern fill found on rect, converting to direct <image>")
-            _convert_group_to_image(group_el, rect_el, image_bytes, img_w, img_h)
+            _convert_group_to_image(group_el, rect_el, data_uri, img_w, img_h)
 
     # Move the rect to the new Y position
     rect_el.set("y", str(new_y))
@@ -355,6 +409,7 @@ def _replace_pattern_image(
     root: ET.Element,
     pattern_id: str,
     image_bytes: bytes,
+    data_uri: bytes,
     rect_w: float,
     rect_h: float,
 ) -> None:
@@ -371,8 +426,7 @@ def _replace_pattern_image(
     image_id = None
     use_el = None
     for child in pattern_el:
-        child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-        if child_tag == "use":
+        if child.tag in _USE_TAGS:
             use_el = child
             href = child.get(f"{{{XLINK_NS}}}href", "") or child.get("href", "")
             if href.startswith("#"):
@@ -382,10 +436,8 @@ def _replace_pattern_image(
     # If no <use>, look for a direct <image> inside the pattern
     if image_id is None:
         for child in pattern_el:
-            child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-            if child_tag == "image":
+            if child.tag in _IMAGE_TAGS:
                 # Direct image inside pattern — replace its href
-                data_uri = _to_base64_uri(image_bytes)
                 child.set(f"{{{XLINK_NS}}}href", data_uri)
                 child.set("href", data_uri)
                 # Update dimensions and recalc scale
@@ -404,7 +456,6 @@ def _replace_pattern_image(
         return
 
     # Replace the image data
-    data_uri = _to_base64_uri(image_bytes)
     image_el.set(f"{{{XLINK_NS}}}href", data_uri)
     image_el.set("href", data_uri)
 
@@ -464,12 +515,11 @@ def _update_pattern_scale(
 def _convert_group_to_image(
     group_el: ET.Element,
     rect_el: ET.Element,
-    image_bytes: bytes,
+    data_uri: bytes,
     width: float,
     height: float,
 ) -> None:
     """Convert a <g>+<rect> into a direct <image> element as fallback."""
-    data_uri = _to_base64_uri(image_bytes)
     x = rect_el.get("x", "0")
     y = rect_el.get("y", "0")
     rx = rect_el.get("rx", "0")
@@ -496,6 +546,7 @@ def _inject_image_simple(
     image_bytes: Optional[bytes],
     new_y: float,
     svg_width: float,
+    data_uri: Optional[bytes] = None,
 ) -> dict:
     """Handle a simple <image id="main_image" .../> element."""
     img_x = _get_float(el, "x", svg_width * 0.05)
@@ -504,7 +555,8 @@ def _inject_image_simple(
     natural_w = img_w
 
     if image_bytes:
-        data_uri = _to_base64_uri(image_bytes)
+        if data_uri is None:
+            data_uri = _to_base64_uri(image_bytes)
         el.set("href", data_uri)
         el.set(f"{{{XLINK_NS}}}href", data_uri)
 
@@ -529,16 +581,19 @@ def _inject_image_simple(
             "natural_width": natural_w}
 
 
-def _inject_source(root: ET.Element, source_text: str, new_y: float, x: float = None) -> None:
+def _inject_source(
+    root: ET.Element, source_text: str, new_y: float, x: float = None,
+) -> Optional[ET.Element]:
     """
-    Replace text of id='source' and reposition it.
+    Replace text of id='source' and reposition it. Returns the source element
+    (None if the template has none).
 
     Handles Figma exports where coordinates are on <tspan> children.
     """
     el = _find_by_id(root, "source")
     if el is None:
         logger.warning("id='source' not found in SVG")
-        return
+        return None
 
     # Read original x from the template (prefer tspan coords)
     if x is None:
@@ -552,44 +607,50 @@ def _inject_source(root: ET.Element, source_text: str, new_y: float, x: float =
         el.remove(child)
 
     # Create a new <tspan> with the proper coordinates
-    tspan = ET.SubElement(el, f"{{{SVG_NS}}}tspan")
-    tspan.set("x", str(x))
-    tspan.set("y", str(new_y))
+    tspan = ET.SubElement(el, _TSPAN_TAGS[0], {"x": str(x), "y": str(new_y)})
     tspan.text = source_text
 
     logger.info(f"SVG source: '{source_text}' at x={x}, y={new_y}")
+    return el
 
 
-def _resize_svg(root, svg_width, new_height, original_width=0):
+def _resize_svg(root, svg_width, new_height, original_width=0, original_height=0):
     """Update SVG dimensions and expand ALL background rects to cover full card."""
-    SVG_NS = "http://www.w3.org/2000/svg"
-    root.set("width", str(int(svg_width)))
-    root.set("height", str(int(new_height)))
-    root.set("viewBox", f"0 0 {int(svg_width)} {int(new_height)}")
+    # A rect covering the whole original canvas can't be beaten — stop there.
+    # The caller usually knows the original size already; otherwise read it.
+    if original_width and original_height:
+        orig_w, orig_h = original_width, original_height
+    else:
+        orig_w, orig_h = _svg_dims(root)
+    full_area = orig_w * orig_h
+
+    width_attr = str(int(svg_width))
+    height_attr = str(int(new_height))
+    root.set("width", width_attr)
+    root.set("height", height_attr)
+    root.set("viewBox", f"0 0 {width_attr} {height_attr}")
 
     # Find and expand background rects.
     # Strategy: any rect whose fill is NOT a pattern URL is a candidate.
     # The background rect is typically the one with the largest area.
+    # Figma emits the frame background first, so this usually exits early.
     best_rect = None
     best_area = 0
     for rect in root.iter(f"{{{SVG_NS}}}rect"):
         fill = rect.get("fill", "")
         if fill.startswith("url("):
             continue  # skip image pattern rects
-        try:
-            rw = float(rect.get("width", "0").replace("px", ""))
-            rh = float(rect.get("height", "0").replace("px", ""))
-        except ValueError:
-            continue
-        area = rw * rh
+        area = _get_float(rect, "width") * _get_float(rect, "height")
         if area > best_area:
             best_area = area
             best_rect = rect
+            if area >= full_area:
+                break
 
     if best_rect is not None:
-        best_rect.set("width", str(int(svg_width)))
-        best_rect.set("height", str(int(new_height)))
-        logger.info(f"Background rect -> {int(svg_width)}x{int(new_height)}")
+        best_rect.set("width", width_attr)
+        best_rect.set("height", height_attr)
+        logger.info(f"Background rect -> {width_attr}x{height_attr}")
 
 
 # ── Main entry point ──────────────────────────────────────────────────
@@ -604,6 +665,26 @@ async def build_card_svg(
     """
     Build a card by injecting content into the channel's SVG template.
 
+    Layout, rendering and compositing are CPU-bound, so they run in a worker
+    thread: the event loop stays responsive and concurrent pipelines build
+    their cards in parallel (lxml, CairoSVG and Pillow release the GIL).
+    See _build_card_svg_sync for the layout rules.
+    """
+    return await asyncio.to_thread(
+        _build_card_svg_sync, channel, title, body, related_image, image_source
+    )
+
+
+def _build_card_svg_sync(
+    channel: ChannelConfig,
+    title: str,
+    body: str,
+    related_image: Optional[bytes] = None,
+    image_source: str = "",
+) -> Optional[bytes]:
+    """
+    Build a card by injecting content into the channel's SVG template.
+
     Two-pass dynamic layout:
     Pass 1: Compute optimal font size and card width to fit text (text is ALWAYS prioritized)
     Pass 2: Inject content with the computed parameters
@@ -624,8 +705,8 @@ async def build_card_svg(
 
     # ── Parse SVG ──
     try:
-        svg_raw = Path(svg_path).read_text(encoding="utf-8")
-        root = ET.fromstring(svg_raw)
+        mtime_ns = Path(svg_path).stat().st_mtime_ns
+        root = copy.deepcopy(_parse_template(str(svg_path), mtime_ns))
     except Exception as e:
         logger.error(f"SVG parse error: {e}")
         return None
@@ -645,7 +726,7 @@ async def build_card_svg(
         fs = text_el.get("font-size", "")
         if not fs:
             style = text_el.get("style", "")
-            m = re.search(r"font-size:\s*(\d+)", style)
+            m = _FONT_SIZE_RE.search(style)
             fs = m.group(1) if m else "22"
         template_font = float(fs.replace("px", "").strip()) if fs else 22.0
 
@@ -680,12 +761,13 @@ async def build_card_svg(
     # ═════════════════════════════════════════════════════════════════════
 
     # ── 1. Inject text with the optimal font size ──
-    text_info = _inject_text(root, body, best_width, font_size_override=best_font)
+    text_info = _inject_text(root, body, best_width, font_size_override=best_font, el=text_el)
     text_bottom = text_info["start_y"] + text_info["text_height"]
 
     # ── 2. Inject image ──
     image_y = text_bottom + TEXT_TO_IMAGE_GAP
-    img_info = _inject_image(root, related_image, image_y, best_width)
+    data_uri = _to_base64_uri(related_image) if related_image else None
+    img_info = _inject_image(root, related_image, image_y, best_width, data_uri=data_uri)
     image_bottom = img_info["img_y"] + img_info["img_height"]
 
     # ── 3. Inject source ──
@@ -697,15 +779,15 @@ async def build_card_svg(
     new_height = source_y + BOTTOM_PADDING + 10
     new_height = max(new_height, original_h)
 
-    _resize_svg(root, best_width, new_height, original_width=svg_w)
+    _resize_svg(root, best_width, new_height, original_width=svg_w, original_height=original_h)
 
     # ── 5. Render → PNG ──
     try:
         import cairosvg
 
-        svg_str = ET.tostring(root, encoding="unicode", xml_declaration=True)
+        svg_bytes = ET.tostring(root, encoding="utf-8", xml_declaration=True)
         png_data = cairosvg.svg2png(
-            bytestring=svg_str.encode("utf-8"),
+            bytestring=svg_bytes,
             output_width=int(best_width),
             output_height=int(new_height),
         )
@@ -742,6 +824,7 @@ def _compose_on_canvas(card_bytes: bytes) -> bytes:
     y = (VIDEO_HEIGHT - new_h) // 2
     canvas.paste(card, (x, y), card)
 
+    # Intermediate frame for FFmpeg — favour encode speed over file size
     out = io.BytesIO()
-    canvas.save(out, format="PNG")
+    canvas.save(out, format="PNG", compress_level=1, optimize=False)
     return out.getvalue()
@@ -6,17 +6,24 @@ OPTIMIZED: For image/URL inputs, performs content analysis AND fact extraction
 in a single Gemini call (merged extraction) to save tokens.
 """
 
-import json
+import asyncio
+import functools
 import logging
 import re
 import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
 from google.genai import types as genai_types
+from selectolax.parser import HTMLParser
 
-from app.services.api_key_manager import get_key_manager
-from app.services.fact_extractor import ExtractedFact
+from app.services import extraction_cache
+from app.services.http_client import get_http_client
+from app.services.fact_extractor import (
+    ExtractedFact, generate_fact_data, load_cached_fact, store_cached_fact,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,19 +35,22 @@ URL_PATTERNS = {
     "youtube": re.compile(r"(https?://)?(www\.)?(youtube\.com/shorts|youtu\.be)/", re.IGNORECASE),
 }
 
+# Static instructions — identical on every call so Gemini can cache them.
+# Per-call context (channel style, caption) is sent after the image.
 MERGED_EXTRACTION_PROMPT = """Analyze this image carefully and extract one interesting, surprising, or educational fact from it.
 If there's text in the image, read and use it. If in another language, translate to English.
-
-{channel_context}
-{additional_context}
+Use any channel style or context given after the image.
 
 Return ONLY JSON:
-{{"title":"Short catchy headline (3-6 words)","body":"The main fact text — MUST be between 25 and 35 words long. Count carefully.","keywords":["keyword1","keyword2","keyword3","keyword4","keyword5"],"image_search_query":"Best 3-5 word search to find a PHOTO of the main subject (use person names, place names, or specific objects)","yt_title":"Catchy YouTube Shorts title (max 70 chars, include emoji)","yt_description":"SHORT description — MAX 2-3 sentences only, keep it brief","yt_hashtags":["#tag1","#tag2","#tag3","#tag4","#tag5"]}}
+{"title":"Short catchy headline (3-6 words)","body":"The main fact text — MUST be between 25 and 35 words long. Count carefully.","keywords":["keyword1","keyword2","keyword3","keyword4","keyword5"],"image_search_query":"Best 3-5 word search to find a PHOTO of the main subject (use person names, place names, or specific objects)","yt_title":"Catchy YouTube Shorts title (max 70 chars, include emoji)","yt_description":"SHORT description — MAX 2-3 sentences only, keep it brief","yt_hashtags":["#tag1","#tag2","#tag3","#tag4","#tag5"]}
 
 CRITICAL: The "body" MUST be between 25 and 35 words. Count every word carefully. If too long, shorten it. If too short, add descriptive details.
 
 KEYWORD RULES: If about a PERSON, first keyword = their full name. If about a PLACE, include the place name. Keywords must be specific and searchable."""
 
+_MERGED_CHANNEL_HEAD = "CHANNEL STYLE: "
+_MERGED_CONTEXT_HEAD = "Context: "
+
 
 def detect_input_type(text: str, has_image: bool = False) -> str:
     """Detect input type: 'url', 'image', 'text_image', or 'text'."""
@@ -60,36 +70,57 @@ async def extract_from_url(url: str, channel_description: str = "") -> dict:
     Download video from social media URL, extract a frame,
     and use Gemini to analyze + extract fact in one call.
 
-    Download strategies (tries in order):
+    Download strategies (raced concurrently, first video wins;
+    ties go to the earlier strategy):
     1. yt-dlp with login-bypass options
     2. Instaloader (Instagram only — works without login)
     3. yt-dlp with transformed URL (embed/mobile)
     4. Cobalt API (open-source video downloader)
     """
+    raw_text, frame_bytes = await _fetch_url_frame(url)
+    return await _analyze_url_frame(raw_text, frame_bytes, channel_description)
+
+
+async def _fetch_url_frame(url: str) -> tuple[str, bytes]:
+    """
+    Download stage of URL extraction: returns (raw_text, frame_bytes).
+    frame_bytes is empty when no video could be downloaded or decoded.
+    """
     logger.info(f"Extracting content from URL: {url}")
 
+    # Set once the race is decided: tells losing strategies' worker threads to
+    # stop (_first_download also waits for them before the directory goes away)
+    cancel = threading.Event()
+
     with tempfile.TemporaryDirectory() as tmp_dir:
-        video_path = None
-        video_title = ""
-        video_desc = ""
+        # Each strategy downloads into its own subdirectory so losers don't collide
+        def _subdir(name: str) -> str:
+            path = Path(tmp_dir) / name
+            path.mkdir()
+            return str(path)
 
+        # Strategies are (name, factory) so skipped ones never create a coroutine
         # ── Strategy 1: yt-dlp with bypass options ──
-        video_path, video_title, video_desc = await _download_ytdlp(url, tmp_dir)
+        strategies = [("ytdlp", lambda: _download_ytdlp(url, _subdir("ytdlp"), cancel))]
 
         # ── Strategy 2: Instaloader (Instagram only) ──
-        if not video_path and "instagram.com" in url:
-            video_path = await _download_instaloader(url, tmp_dir)
+        if "instagram.com" in url:
+            strategies.append(("instaloader", lambda: _video_only(
+                _download_instaloader(url, _subdir("instaloader"), cancel)
+            )))
 
         # ── Strategy 3: yt-dlp with transformed URL ──
-        if not video_path:
-            alt_url = _transform_url(url)
-            if alt_url and alt_url != url:
-                logger.info(f"Trying transformed URL: {alt_url}")
-                video_path, video_title, video_desc = await _download_ytdlp(alt_url, tmp_dir)
+        alt_url = _transform_url(url)
+        if alt_url and alt_url != url:
+            logger.info(f"Also trying transformed URL: {alt_url}")
+            strategies.append(("ytdlp_alt", lambda: _download_ytdlp(alt_url, _subdir("ytdlp_alt"), cancel)))
 
         # ── Strategy 4: Cobalt API ──
-        if not video_path:
-            video_path = await _download_cobalt(url, tmp_dir)
+        strategies.append(("cobalt", lambda: _video_only(_download_cobalt(url, _subdir("cobalt")))))
+
+        video_path, video_title, video_desc = await _first_download(
+            _platform_of(url), strategies, cancel
+        )
 
         # ── Build raw text from metadata ──
         raw_text = ""
@@ -103,7 +134,7 @@ async def extract_from_url(url: str, channel_description: str = "") -> dict:
         if not video_path:
             logger.warning("All download strategies failed — falling back to OG metadata")
             og_text = await _scrape_og_metadata(url)
-            return {"raw_text": og_text or f"Content from URL: {url}", "source": "url"}
+            return og_text or f"Content from URL: {url}", b""
 
         logger.info(f"Video downloaded: {video_path}")
 
@@ -112,73 +143,231 @@ async def extract_from_url(url: str, channel_description: str = "") -> dict:
             og_text = await _scrape_og_metadata(url)
             raw_text = og_text or f"Content from URL: {url}"
 
-        # ── Extract frame from video using FFmpeg ──
-        frame_path = Path(tmp_dir) / "frame.jpg"
-        import subprocess
-
+        # ── Extract frame from video using FFmpeg (JPEG piped to stdout) ──
+        # Downscaled to ≤1024px wide in the same pass — plenty for Gemini.
+        frame_bytes = b""
         try:
-            subprocess.run(
-                [
-                    "ffmpeg", "-i", str(video_path),
-                    "-vf", "select=eq(n\\,30)",
-                    "-vframes", "1",
-                    "-q:v", "2",
-                    str(frame_path),
-                ],
-                capture_output=True,
-                timeout=30,
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-i", str(video_path),
+                "-vf", "select=eq(n\\,30),scale='min(1024,iw)':-2",
+                "-vframes", "1",
+                "-q:v", "2",
+                "-f", "image2pipe", "-vcodec", "mjpeg", "pipe:1",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
+            try:
+                frame_bytes, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
         except Exception as e:
-            logger.warning(f"FFmpeg frame extraction failed: {e}")
+            logger.warning(f"FFmpeg frame extraction failed: {e!r}")
 
-        if frame_path.exists():
-            frame_bytes = frame_path.read_bytes()
-            # Merged: analyze image + extract fact in one call
-            fact = await _merged_analyze_and_extract(
-                frame_bytes, raw_text, channel_description
-            )
-            if fact:
-                return {"raw_text": raw_text, "source": "url", "fact": fact}
+        return raw_text, frame_bytes
 
-        return {"raw_text": raw_text, "source": "url"}
 
+async def _analyze_url_frame(
+    raw_text: str, frame_bytes: bytes, channel_description: str = "",
+) -> dict:
+    """Gemini stage of URL extraction: turn a downloaded frame into a fact."""
+    if frame_bytes:
+        # Merged: analyze image + extract fact in one call
+        fact = await _merged_analyze_and_extract(
+            frame_bytes, raw_text, channel_description
+        )
+        if fact:
+            return {"raw_text": raw_text, "source": "url", "fact": fact}
 
-async def _download_ytdlp(url: str, tmp_dir: str) -> tuple:
-    """Download video with yt-dlp. Returns (video_path, title, description)."""
+    return {"raw_text": raw_text, "source": "url"}
+
+
+async def _video_only(download) -> tuple:
+    """Adapt a path-only download coroutine to the (path, title, description) shape."""
+    return (await download, "", "")
+
+
+def _platform_of(url: str) -> str:
+    """Name of the URL_PATTERNS platform a URL belongs to, or "other"."""
+    for platform, pattern in URL_PATTERNS.items():
+        if pattern.search(url):
+            return platform
+    return "other"
+
+
+# Negative cache: (platform, strategy) -> (consecutive failures, monotonic time
+# of the last one). A strategy is left out of the race for a platform only
+# after it failed several times in a row within the window, so one bad URL
+# (deleted, private, geo-blocked) doesn't disable it for every other URL.
+_STRATEGY_BACKOFF_SECONDS = 300
+_STRATEGY_FAILURE_THRESHOLD = 3
+_strategy_failures: dict[tuple[str, str], tuple[int, float]] = {}
+
+
+def _strategy_backed_off(platform: str, name: str) -> bool:
+    count, failed_at = _strategy_failures.get((platform, name), (0, 0.0))
+    return (
+        count >= _STRATEGY_FAILURE_THRESHOLD
+        and time.monotonic() - failed_at < _STRATEGY_BACKOFF_SECONDS
+    )
+
+
+def _record_strategy_failure(key: tuple[str, str]) -> None:
+    now = time.monotonic()
+    count, failed_at = _strategy_failures.get(key, (0, 0.0))
+    if now - failed_at >= _STRATEGY_BACKOFF_SECONDS:
+        count = 0
+    _strategy_failures[key] = (count + 1, now)
+
+
+async def _first_download(platform: str, strategies: list, cancel: threading.Event) -> tuple:
+    """
+    Run download strategies concurrently and return the first
+    (video_path, title, description) that produced a video.
+    Remaining strategies are cancelled as soon as one succeeds: `cancel` is
+    set so their worker threads abort, and this waits until they have.
+
+    `strategies` is a list of (name, factory) pairs. Strategies that failed
+    repeatedly for this platform within the backoff window are skipped,
+    unless that would leave nothing to try.
+    """
+    active = [(n, f) for n, f in strategies if not _strategy_backed_off(platform, n)]
+    if not active:
+        active = strategies
+    skipped = len(strategies) - len(active)
+    if skipped:
+        logger.info(f"Skipping {skipped} recently failing download strategies for {platform}")
+
+    tasks = [asyncio.create_task(factory()) for _, factory in active]
+    names = {task: name for task, (name, _) in zip(tasks, active)}
+    pending = set(tasks)
     try:
-        import yt_dlp
-
-        ydl_opts = {
-            "outtmpl": f"{tmp_dir}/%(id)s.%(ext)s",
-            "format": "best[height<=720]/best/bestvideo+bestaudio",
-            "noplaylist": True,
-            "quiet": True,
-            "no_warnings": True,
-            "merge_output_format": "mp4",
-            "socket_timeout": 30,
-            "retries": 2,
-            # Bypass login requirements
-            "extractor_args": {
-                "instagram": {"skip": ["login"]},
-                "facebook": {"skip": ["login"]},
-            },
-            "http_headers": {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                              "AppleWebKit/537.36 (KHTML, like Gecko) "
-                              "Chrome/120.0.0.0 Safari/537.36",
-            },
-        }
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Check in strategy order so ties go to the preferred strategy
+            for task in tasks:
+                if task not in done or task.cancelled():
+                    continue
+                key = (platform, names[task])
+                if task.exception() is None and task.result()[0]:
+                    _strategy_failures.pop(key, None)
+                    return task.result()
+                _record_strategy_failure(key)
+        return (None, "", "")
+    finally:
+        cancel.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_in_thread(fn, *args):
+    """
+    asyncio.to_thread, except that a cancelled caller still waits for the
+    worker thread to return before re-raising. Download threads can't be
+    killed, so this keeps them from writing into a temp dir being removed.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+# yt-dlp options shared by every download; only the output template varies per call
+_YDL_OPTS = {
+    "format": "best[height<=720]/best/bestvideo+bestaudio",
+    "noplaylist": True,
+    "quiet": True,
+    "no_warnings": True,
+    "merge_output_format": "mp4",
+    "socket_timeout": 30,
+    "retries": 2,
+    # Bypass login requirements
+    "extractor_args": {
+        "instagram": {"skip": ["login"]},
+        "facebook": {"skip": ["login"]},
+    },
+    "http_headers": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                      "AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/120.0.0.0 Safari/537.36",
+    },
+}
+
+# yt-dlp and Instaloader are heavy imports (hundreds of submodules) — load them
+# once, ideally at startup via preload_downloaders(), not on the first request
+@functools.cache
+def _yt_dlp():
+    import yt_dlp
+    return yt_dlp
+
+
+@functools.cache
+def _instaloader():
+    import instaloader
+    return instaloader
+
+
+def preload_downloaders() -> None:
+    """Import the downloader libraries ahead of time (blocking; run in a thread)."""
+    for loader in (_yt_dlp, _instaloader):
+        try:
+            loader()
+        except ImportError as e:
+            logger.warning(f"Downloader not available: {e}")
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            title = info.get("title", "")
-            desc = info.get("description", "")
 
-            # Find downloaded file
-            for f in Path(tmp_dir).iterdir():
-                if f.is_file() and f.suffix in (".mp4", ".webm", ".mkv", ".mov"):
-                    logger.info(f"yt-dlp downloaded: {f.name}")
-                    return (f, title, desc)
+_VIDEO_SUFFIXES = (".mp4", ".webm", ".mkv", ".mov")
+
+def _ytdlp_extract(url: str, tmp_dir: str, cancel: threading.Event) -> dict:
+    """
+    Blocking yt-dlp download into tmp_dir (run in a worker thread). Aborts
+    at the next progress update once `cancel` is set.
+
+    YoutubeDL is not reentrant, so each call gets its own instance: the racing
+    ytdlp/ytdlp_alt strategies (and other URLs) download in parallel instead
+    of queueing behind one shared instance. The module import is the
+    expensive part and is cached by _yt_dlp().
+    """
+    yt_dlp = _yt_dlp()
+
+    def _check_cancel(_progress: dict) -> None:
+        if cancel.is_set():
+            raise yt_dlp.utils.DownloadCancelled("download strategy lost the race")
+
+    _check_cancel({})
+    opts = {
+        **_YDL_OPTS,
+        "outtmpl": {"default": f"{tmp_dir}/%(id)s.%(ext)s"},
+        "progress_hooks": [_check_cancel],
+    }
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        return ydl.extract_info(url, download=True)
+
+
+async def _download_ytdlp(url: str, tmp_dir: str, cancel: threading.Event) -> tuple:
+    """Download video with yt-dlp. Returns (video_path, title, description)."""
+    try:
+        info = await _run_in_thread(_ytdlp_extract, url, tmp_dir, cancel)
+        title = info.get("title", "")
+        desc = info.get("description", "")
+
+        # yt-dlp reports the final (post-merge) path; the outtmpl gives it otherwise
+        downloads = info.get("requested_downloads") or [{}]
+        candidates = [downloads[0].get("filepath"), f"{tmp_dir}/{info.get('id')}.mp4"]
+        for candidate in candidates:
+            if candidate and Path(candidate).is_file():
+                logger.info(f"yt-dlp downloaded: {Path(candidate).name}")
+                return (Path(candidate), title, desc)
+
+        # Safety net: scan the strategy's own directory
+        for f in Path(tmp_dir).iterdir():
+            if f.is_file() and f.suffix in _VIDEO_SUFFIXES:
+                logger.info(f"yt-dlp downloaded: {f.name}")
+                return (f, title, desc)
 
     except Exception as e:
         logger.warning(f"yt-dlp download failed: {e}")
@@ -186,10 +375,12 @@ async def _download_ytdlp(url: str, tmp_dir: str) -> tuple:
     return (None, "", "")
 
 
-async def _download_instaloader(url: str, tmp_dir: str) -> Optional[Path]:
+async def _download_instaloader(
+    url: str, tmp_dir: str, cancel: threading.Event,
+) -> Optional[Path]:
     """Download Instagram video/reel using Instaloader (no login needed for public posts)."""
     try:
-        import instaloader
+        instaloader = _instaloader()
 
         logger.info("Trying Instaloader for Instagram download...")
 
@@ -202,26 +393,40 @@ async def _download_instaloader(url: str, tmp_dir: str) -> Optional[Path]:
         shortcode = ig_match.group(1)
         logger.info(f"Instagram shortcode: {shortcode}")
 
-        # Create Instaloader instance (no login)
-        L = instaloader.Instaloader(
-            download_videos=True,
-            download_video_thumbnails=False,
-            download_geotags=False,
-            download_comments=False,
-            save_metadata=False,
-            compress_json=False,
-            dirname_pattern=tmp_dir,
-            filename_pattern="{shortcode}",
-            quiet=True,
-        )
+        def _fetch():
+            # Create Instaloader instance (no login)
+            L = instaloader.Instaloader(
+                download_videos=True,
+                download_video_thumbnails=False,
+                download_geotags=False,
+                download_comments=False,
+                save_metadata=False,
+                compress_json=False,
+                dirname_pattern=tmp_dir,
+                filename_pattern="{shortcode}",
+                quiet=True,
+            )
 
-        # Download the post
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
-        L.download_post(post, target=Path(tmp_dir))
+            # Instaloader has no abort hook — check between its network steps
+            if cancel.is_set():
+                return
+            post = instaloader.Post.from_shortcode(L.context, shortcode)
+            if cancel.is_set():
+                return
+            # Download the post
+            L.download_post(post, target=Path(tmp_dir))
 
-        # Find downloaded video file
+        await _run_in_thread(_fetch)
+
+        # filename_pattern="{shortcode}" puts the video at a known path
+        candidate = Path(tmp_dir) / f"{shortcode}.mp4"
+        if candidate.is_file():
+            logger.info(f"Instaloader downloaded: {candidate.name}")
+            return candidate
+
+        # Safety net: scan for any other video container
         for f in Path(tmp_dir).rglob("*"):
-            if f.is_file() and f.suffix in (".mp4", ".webm", ".mkv", ".mov"):
+            if f.is_file() and f.suffix in _VIDEO_SUFFIXES:
                 logger.info(f"Instaloader downloaded: {f.name}")
                 return f
 
@@ -257,19 +462,17 @@ def _transform_url(url: str) -> Optional[str]:
 async def _download_cobalt(url: str, tmp_dir: str) -> Optional[Path]:
     """Download video using Cobalt API (open-source, no login needed)."""
     try:
-        import httpx
-
         logger.info("Trying Cobalt API for video download...")
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                "https://api.cobalt.tools/",
-                json={"url": url},
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-            )
+        client = get_http_client()
+        resp = await client.post(
+            "https://api.cobalt.tools/",
+            json={"url": url},
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+        )
 
         if resp.status_code != 200:
             logger.warning(f"Cobalt API returned {resp.status_code}")
@@ -283,8 +486,7 @@ async def _download_cobalt(url: str, tmp_dir: str) -> Optional[Path]:
             return None
 
         # Download the video file
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
-            vid_resp = await client.get(video_url)
+        vid_resp = await client.get(video_url, timeout=60)
 
         if vid_resp.status_code == 200:
             video_path = Path(tmp_dir) / "cobalt_video.mp4"
@@ -304,8 +506,6 @@ async def _scrape_og_metadata(url: str) -> Optional[str]:
     Works for Instagram, TikTok, Facebook, YouTube — any page with og:tags.
     """
     try:
-        import httpx
-
         logger.info(f"Scraping OG metadata from: {url}")
 
         headers = {
@@ -315,18 +515,20 @@ async def _scrape_og_metadata(url: str) -> Optional[str]:
             "Accept-Language": "en-US,en;q=0.9",
         }
 
-        async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-            resp = await client.get(url, headers=headers)
+        resp = await get_http_client().get(url, headers=headers, timeout=15)
 
         if resp.status_code != 200:
             return None
 
         html = resp.text
 
-        og_title = _extract_meta(html, "og:title")
-        og_desc = _extract_meta(html, "og:description")
-        page_title = _extract_tag(html, "title")
-        meta_desc = _extract_meta(html, "description")
+        # One parse, then every lookup walks the tree instead of the raw text
+        tree = HTMLParser(html)
+        og_title = _meta_content(tree, "og:title")
+        og_desc = _meta_content(tree, "og:description")
+        title_node = tree.css_first("title")
+        page_title = title_node.text(strip=True) if title_node else ""
+        meta_desc = _meta_content(tree, "description")
 
         parts = []
         title = og_title or page_title or ""
@@ -334,7 +536,8 @@ async def _scrape_og_metadata(url: str) -> Optional[str]:
 
         if title:
             parts.append(f"Title: {title}")
-        if desc:
+        # Many pages just repeat the title as their description
+        if desc and desc != title:
             parts.append(f"Description: {desc}")
 
         return "\n".join(parts) if parts else None
@@ -344,24 +547,12 @@ async def _scrape_og_metadata(url: str) -> Optional[str]:
         return None
 
 
-def _extract_meta(html: str, name: str) -> str:
-    """Extract content from a meta tag (property or name)."""
-    match = re.search(
-        rf'<meta\s+(?:[^>]*\s)?(?:property|name)=["\'](?:og:)?{re.escape(name)}["\'][^>]*\s+content=["\']([^"\']*)["\']',
-        html, re.IGNORECASE
-    )
-    if not match:
-        match = re.search(
-            rf'<meta\s+(?:[^>]*\s)?content=["\']([^"\']*)["\'][^>]*\s+(?:property|name)=["\'](?:og:)?{re.escape(name)}["\']',
-            html, re.IGNORECASE
-        )
-    return match.group(1).strip() if match else ""
-
-
-def _extract_tag(html: str, tag: str) -> str:
-    """Extract text content from an HTML tag."""
-    match = re.search(rf'<{tag}[^>]*>([^<]+)</{tag}>', html, re.IGNORECASE)
-    return match.group(1).strip() if match else ""
+def _meta_content(tree, name: str) -> str:
+    """Content of the first <meta property=name> or <meta name=name> tag."""
+    node = tree.css_first(f'meta[property="{name}"], meta[name="{name}"]')
+    if node is None:
+        return ""
+    return (node.attributes.get("content") or "").strip()
 
 
 async def extract_from_image(
@@ -391,50 +582,33 @@ async def _merged_analyze_and_extract(
     Single Gemini call: analyzes the image AND extracts structured fact + YT metadata.
     Saves one full API call compared to analyze-then-extract.
     """
-    try:
-        manager = get_key_manager()
+    model = "gemini-2.5-flash"
+    cache_key = extraction_cache.make_key(
+        model, MERGED_EXTRACTION_PROMPT, channel_description, additional_context, image_bytes,
+    )
+    cached = load_cached_fact(cache_key)
+    if cached:
+        logger.info("Merged extraction cache hit")
+        return cached
 
-        channel_context = ""
+    try:
+        tail = []
         if channel_description:
-            channel_context = f"CHANNEL STYLE: {channel_description}"
-
-        ctx = ""
+            tail.append(_MERGED_CHANNEL_HEAD + channel_description)
         if additional_context:
-            ctx = f"Context: {additional_context}"
-
-        prompt = MERGED_EXTRACTION_PROMPT.format(
-            channel_context=channel_context,
-            additional_context=ctx,
-        )
+            tail.append(_MERGED_CONTEXT_HEAD + additional_context)
+        prompt = "\n".join(tail).strip()
 
-        response = await manager.gemini_generate(
-            model="gemini-2.5-flash",
-            contents=[
-                genai_types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg"),
-                prompt,
-            ],
-            config=genai_types.GenerateContentConfig(
-                temperature=0.7,
-                response_mime_type="application/json",
-            ),
-        )
+        contents = [genai_types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")]
+        if prompt:
+            contents.append(prompt)
 
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-            text = text.rsplit("```", 1)[0]
-
-        data = json.loads(text)
-
-        return ExtractedFact(
-            title=data.get("title", "Did You Know?"),
-            body=data.get("body", ""),
-            keywords=data.get("keywords", ["interesting", "facts"]),
-            image_search_query=data.get("image_search_query", ""),
-            yt_title=data.get("yt_title", ""),
-            yt_description=data.get("yt_description", ""),
-            yt_hashtags=data.get("yt_hashtags", []),
+        data = await generate_fact_data(
+            contents, cached_prefix=MERGED_EXTRACTION_PROMPT, model=model,
         )
+        fact = ExtractedFact(**data)
+        store_cached_fact(cache_key, fact, model=model, source="image", temperature=0.7)
+        return fact
     except Exception as e:
         logger.error(f"Merged extraction failed: {e}")
         return None
@@ -4,10 +4,11 @@ Sequentially reads an uploaded CSV for a specific channel to generate ideas.
 """
 
 import csv
+import itertools
 import logging
 
 from app import settings_store
-from app.services.fact_extractor import ExtractedFact
+from app.services.fact_extractor import ExtractedFact, extract_facts_batch
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +26,32 @@ async def scrape_csv_ideas(channel_slug: str, count: int = 1) -> list[ExtractedF
 
     last_index = ch.get("csv_last_row_index", 0)
     ideas = []
-    
+    rows_read = 0
+
     try:
-        with open(csv_path, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            
-            # Skip rows already processed
-            for _ in range(last_index):
-                try:
-                    next(reader)
-                except StopIteration:
-                    logger.warning(f"Reached end of CSV for {channel_slug}.")
-                    return ideas
-            
-            # Read the next `count` rows
-            rows_read = 0
-            while rows_read < count:
-                try:
-                    row = next(reader)
-                except StopIteration:
-                    break
-                
+        stat = csv_path.stat()
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            # Feed the reader via readline() so f.tell() stays usable
+            # (iterating a text file with next() disables tell())
+            lines = iter(f.readline, "")
+            reader = csv.DictReader(lines)
+            fieldnames = reader.fieldnames
+
+            resume = ch.get("csv_resume") or {}
+            if (
+                last_index
+                and resume.get("index") == last_index
+                and resume.get("mtime_ns") == stat.st_mtime_ns
+                and resume.get("size") == stat.st_size
+            ):
+                # Same file as last time — jump straight to where we stopped
+                f.seek(resume["offset"])
+                rows = csv.DictReader(lines, fieldnames=fieldnames)
+            else:
+                # File replaced or no offset yet — skip already-processed rows
+                rows = itertools.islice(reader, last_index, None)
+
+            for row in itertools.islice(rows, count):
                 title = row.get("title", "").strip()
                 body = row.get("body", "").strip()
                 # post_id = row.get("id", "").strip() # unused right now unless we want history tracking
@@ -72,10 +78,39 @@ async def scrape_csv_ideas(channel_slug: str, count: int = 1) -> list[ExtractedF
                 )
                 ideas.append(fact)
                 rows_read += 1
-                
+
+            offset = f.tell()
+
+            if rows_read == 0:
+                logger.warning(f"Reached end of CSV for {channel_slug}.")
+
+        if ideas:
+            # One Gemini call for the whole batch — keep the CSV's own title/body
+            # on the card, but take real keywords and YouTube metadata from Gemini
+            enriched = await extract_facts_batch(
+                [f"{idea.title}\n\n{idea.body}" for idea in ideas],
+                ch.get("description", ""),
+            )
+            for idea, meta in zip(ideas, enriched):
+                if meta is None:
+                    continue
+                idea.keywords = meta.keywords or idea.keywords
+                idea.image_search_query = meta.image_search_query
+                idea.yt_title = meta.yt_title or idea.yt_title
+                idea.yt_description = meta.yt_description or idea.yt_description
+                idea.yt_hashtags = meta.yt_hashtags or idea.yt_hashtags
+
         if rows_read > 0:
             # Update last index in settings
-            settings_store.update_channel(channel_slug, {"csv_last_row_index": last_index + rows_read})
+            settings_store.update_channel(channel_slug, {
+                "csv_last_row_index": last_index + rows_read,
+                "csv_resume": {
+                    "index": last_index + rows_read,
+                    "offset": offset,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                },
+            })
             logger.info(f"Parsed {rows_read} rows from CSV. Next index is {last_index + rows_read}.")
             
     except Exception as e:
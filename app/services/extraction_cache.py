@@ -0,0 +1,68 @@
+"""
+Extraction Cache — content-addressable on-disk cache for Gemini fact extraction.
+
+Identical inputs (same model, prompt, channel style and content/image) map to
+the same SHA256 key, so retries and pipeline reruns skip the Gemini call.
+Stored as one JSON file per key in data/extraction_cache/.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CACHE_DIR = BASE_DIR / "data" / "extraction_cache"
+
+
+def make_key(*parts: Union[str, bytes]) -> str:
+    """
+    Hash the given parts into a cache key.
+
+    Each part is length-prefixed (8 bytes, little-endian) so that
+    ("ab", "c") and ("a", "bc") never collide.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def get(key: str) -> Optional[dict]:
+    """Return the cached value for a key, or None on a miss."""
+    path = CACHE_DIR / f"{key}.json"
+    if not path.exists():
+        return None
+    try:
+        return orjson.loads(path.read_bytes()).get("value")
+    except Exception as e:
+        logger.warning(f"Unreadable extraction cache entry {key[:12]}: {e}")
+        evict(key)
+        return None
+
+
+def put(key: str, value: dict, meta: Optional[dict] = None) -> None:
+    """Store a value under a key, with a UTC timestamp and optional metadata."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "meta": meta or {},
+        "value": value,
+    }
+    try:
+        (CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(entry))
+    except Exception as e:
+        logger.warning(f"Failed to write extraction cache entry: {e}")
+
+
+def evict(key: str) -> None:
+    """Remove a cache entry (e.g. after a schema mismatch)."""
+    (CACHE_DIR / f"{key}.json").unlink(missing_ok=True)
@@ -3,18 +3,24 @@ Fact Extractor — uses Gemini to process raw content into structured facts
 suitable for a social media card, plus YouTube video metadata.
 """
 
-import json
+import asyncio
+import html
 import logging
-from dataclasses import dataclass, field
+import re
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Optional
 
 from google.genai import types as genai_types
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from app.services import extraction_cache
 from app.services.api_key_manager import get_key_manager
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedFact:
     title: str  # Short headline (3-6 words)
     body: str  # The fact text (5-8 sentences)
@@ -25,14 +31,29 @@ class ExtractedFact:
     yt_hashtags: list[str] = field(default_factory=list)  # YouTube hashtags
 
 
-FACT_EXTRACTION_PROMPT = """You are a fact-extraction AI for a viral YouTube Shorts channel.
+class ExtractedFactSchema(BaseModel):
+    """Gemini structured-output schema mirroring ExtractedFact."""
+    title: str
+    body: str
+    keywords: list[str]
+    image_search_query: str
+    yt_title: str
+    yt_description: str
+    yt_hashtags: list[str]
 
-{channel_context}
 
-Given the following raw content, extract the SINGLE most interesting, surprising, or educational fact from it.
+_FACT_ADAPTER = TypeAdapter(ExtractedFactSchema)
+_FACT_LIST_ADAPTER = TypeAdapter(list[ExtractedFactSchema])
+
+
+# Static instructions — identical on every call so Gemini can cache them.
+# Per-call content is appended after this prefix (see the _FACT_* pieces below).
+FACT_EXTRACTION_PROMPT = """You are a fact-extraction AI for a viral YouTube Shorts channel.
+
+Given the raw content at the end of this prompt, extract the SINGLE most interesting, surprising, or educational fact from it.
 
 Format your response as JSON with these exact keys:
-{{
+{
   "title": "Short catchy headline (3-6 words, no period)",
   "body": "The main fact text. MUST be between 25 and 35 words long (including spaces). Count carefully before answering.",
   "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"],
@@ -40,7 +61,7 @@ Format your response as JSON with these exact keys:
   "yt_title": "A catchy YouTube Shorts video title (max 70 chars, include an emoji)",
   "yt_description": "SHORT YouTube description — MAX 2-3 sentences only. Keep it brief and engaging.",
   "yt_hashtags": ["#hashtag1", "#hashtag2", "#hashtag3", "#hashtag4", "#hashtag5"]
-}}
+}
 
 CRITICAL — BODY WORD COUNT RULES:
 - The "body" field MUST be between 25 and 35 words (including spaces)
@@ -65,23 +86,49 @@ Rules:
 - image_search_query is the single best phrase to Google Image Search for a photo of the subject
 - yt_hashtags should include 5 relevant trending hashtags (with # prefix)
 - Return ONLY the JSON, no other text
+"""
 
-Raw content:
+# Pre-split tail pieces — the hot path only joins strings, no template parsing
+_FACT_CHANNEL_HEAD = "CHANNEL STYLE GUIDE: "
+_FACT_CHANNEL_NOTE = "\nWrite the fact and YouTube metadata in the style and tone described above.\n"
+_FACT_RAW_HEADER = "\nRaw content:\n"
+_FACT_TAIL_NO_CHANNEL = "\n" + _FACT_RAW_HEADER
+
+FACT_EXTRACTION_BATCH_TAIL = """
+{channel_context}
+BATCH MODE: below are {count} numbered raw contents. Apply the instructions above to EACH one
+and return ONLY a JSON array of exactly {count} objects, where element i corresponds to raw content [i].
+
+{items}
 """
 
 
-def _enforce_body_length(body: str, min_words: int = 10, max_words: int = 35) -> str:
+_BODY_MAX_WORDS = 35
+
+
+@lru_cache(maxsize=8)
+def _word_truncate_re(max_words: int) -> re.Pattern:
+    """Match the first `max_words` words; group 2 is set if more follow."""
+    return re.compile(r"((?:\S+\s+){0,%d}\S+)(\s+\S)?" % (max_words - 1))
+
+
+_WORD_TRUNCATE_RE = _word_truncate_re(_BODY_MAX_WORDS)
+_WORD_SEP_RE = re.compile(r"\s+")
+
+
+def _enforce_body_length(body: str, min_words: int = 10, max_words: int = _BODY_MAX_WORDS) -> str:
     """Ensure body text is within the target word count range.
     
     Truncates at the last sentence boundary (. ! ?) within the word limit
     to avoid incomplete thoughts like 'as long as'.
     """
     body = body.strip()
-    words = body.split()
-    if len(words) <= max_words:
+    pattern = _WORD_TRUNCATE_RE if max_words == _BODY_MAX_WORDS else _word_truncate_re(max_words)
+    m = pattern.match(body)
+    if not m or m.group(2) is None:
         return body
-    # Truncate to max_words first
-    truncated = " ".join(words[:max_words])
+    # Slice of the first max_words words — no split/join round trip
+    truncated = m.group(1)
     # Try to find the last sentence-ending punctuation
     # Look for the last '.', '!', or '?' in the truncated text
     last_period = max(truncated.rfind(". "), truncated.rfind("! "), truncated.rfind("? "))
@@ -92,7 +139,7 @@ def _enforce_body_length(body: str, min_words: int = 10, max_words: int = 35) ->
         # Cut at the last complete sentence
         result = truncated[:last_period + 1]
         # Only use this if the result is at least min_words long
-        if len(result.split()) >= min_words:
+        if len(_WORD_SEP_RE.findall(result)) + 1 >= min_words:
             return result
     # No good sentence boundary found — just truncate cleanly
     truncated = truncated.rstrip(",;:— ")
@@ -102,49 +149,136 @@ def _enforce_body_length(body: str, min_words: int = 10, max_words: int = 35) ->
     return truncated
 
 
-async def extract_facts(raw_content: str, channel_description: str = "") -> ExtractedFact:
-    """Extract structured facts + YouTube metadata from raw content using Gemini."""
-    logger.info("Extracting facts with Gemini")
+def _trim_raw_content(raw: str, max_chars: int = 3200) -> str:
+    """Clean up raw content and cap its length (~800 tokens) before prompting.
 
-    # Build channel context if description is provided
-    channel_context = ""
-    if channel_description:
-        channel_context = (
-            f"CHANNEL STYLE GUIDE: {channel_description}\n"
-            "Write the fact and YouTube metadata in the style and tone described above.\n"
-        )
+    Decodes HTML entities and collapses whitespace. Over-long content keeps
+    its head and tail — titles/leads and conclusions — around a marker.
+    """
+    text = _WORD_SEP_RE.sub(" ", html.unescape(raw)).strip()
+    if len(text) <= max_chars:
+        return text
+    half = max_chars // 2
+    return f"{text[:half].rstrip()} [...] {text[-half:].lstrip()}"
 
+
+def _fact_from_data(data: dict, raw_content: str) -> ExtractedFact:
+    """Build an ExtractedFact from Gemini's JSON object, with fallbacks."""
+    return ExtractedFact(
+        title=data.get("title", "Did You Know?"),
+        body=data.get("body", raw_content[:200]),
+        keywords=data.get("keywords", ["interesting", "facts"]),
+        image_search_query=data.get("image_search_query", ""),
+        yt_title=data.get("yt_title", ""),
+        yt_description=data.get("yt_description", ""),
+        yt_hashtags=data.get("yt_hashtags", []),
+    )
+
+
+def _channel_context(channel_description: str) -> str:
+    """Build the channel style block for the prompt tail."""
+    if not channel_description:
+        return ""
+    return "".join([_FACT_CHANNEL_HEAD, channel_description, _FACT_CHANNEL_NOTE])
+
+
+def load_cached_fact(key: str) -> Optional[ExtractedFact]:
+    """Load a fact from the extraction cache; entries with a stale schema are evicted."""
+    data = extraction_cache.get(key)
+    if data is None:
+        return None
     try:
-        manager = get_key_manager()
+        return ExtractedFact(**data)
+    except TypeError:
+        extraction_cache.evict(key)
+        return None
+
+
+def store_cached_fact(key: str, fact: ExtractedFact, **meta) -> None:
+    """Save a successfully extracted fact to the extraction cache."""
+    extraction_cache.put(key, asdict(fact), meta=meta)
 
-        prompt = FACT_EXTRACTION_PROMPT.format(channel_context=channel_context) + raw_content
 
+async def generate_fact_data(
+    contents,
+    cached_prefix: str,
+    batch: bool = False,
+    model: str = "gemini-2.5-flash",
+    temperature: float = 0.7,
+    max_retries: int = 2,
+):
+    """
+    Call Gemini with the ExtractedFact response schema and return the
+    validated result as a dict (or a list of dicts when batch=True).
+
+    An invalid response is retried up to `max_retries` times, 1s apart,
+    with the validation error appended to the prompt as feedback.
+    """
+    schema = list[ExtractedFactSchema] if batch else ExtractedFactSchema
+    adapter = _FACT_LIST_ADAPTER if batch else _FACT_ADAPTER
+    manager = get_key_manager()
+    config = genai_types.GenerateContentConfig(
+        temperature=temperature,
+        response_mime_type="application/json",
+        response_schema=schema,
+    )
+
+    attempt_contents = contents
+    for attempt in range(max_retries + 1):
         response = await manager.gemini_generate(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai_types.GenerateContentConfig(
-                temperature=0.7,
-                response_mime_type="application/json",
-            ),
+            model=model,
+            contents=attempt_contents,
+            config=config,
+            cached_prefix=cached_prefix,
         )
+        try:
+            parsed = response.parsed
+            if parsed is None:
+                parsed = adapter.validate_json(response.text or "")
+            return adapter.dump_python(parsed)
+        except ValidationError as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(f"Gemini returned invalid fact JSON (attempt {attempt + 1}): {e}")
+            feedback = (
+                "Your previous answer did not match the required JSON schema:\n"
+                f"{e}\nReturn ONLY valid JSON matching the schema."
+            )
+            if isinstance(contents, list):
+                attempt_contents = [*contents, feedback]
+            else:
+                attempt_contents = f"{contents}\n\n{feedback}"
+            await asyncio.sleep(1)
+
+
+async def extract_facts(raw_content: str, channel_description: str = "") -> ExtractedFact:
+    """Extract structured facts + YouTube metadata from raw content using Gemini."""
+    logger.info("Extracting facts with Gemini")
 
-        # Parse JSON from response
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-            text = text.rsplit("```", 1)[0]
+    raw_content = _trim_raw_content(raw_content)
+    model = "gemini-2.5-flash"
+    cache_key = extraction_cache.make_key(
+        model, FACT_EXTRACTION_PROMPT, channel_description, raw_content,
+    )
+    cached = load_cached_fact(cache_key)
+    if cached:
+        logger.info("Fact extraction cache hit")
+        return cached
 
-        data = json.loads(text)
+    try:
+        if channel_description:
+            prompt = "".join([
+                "\n", _FACT_CHANNEL_HEAD, channel_description, _FACT_CHANNEL_NOTE,
+                _FACT_RAW_HEADER, raw_content,
+            ])
+        else:
+            prompt = _FACT_TAIL_NO_CHANNEL + raw_content
 
-        return ExtractedFact(
-            title=data.get("title", "Did You Know?"),
-            body=data.get("body", raw_content[:200]),
-            keywords=data.get("keywords", ["interesting", "facts"]),
-            image_search_query=data.get("image_search_query", ""),
-            yt_title=data.get("yt_title", ""),
-            yt_description=data.get("yt_description", ""),
-            yt_hashtags=data.get("yt_hashtags", []),
-        )
+        data = await generate_fact_data(prompt, cached_prefix=FACT_EXTRACTION_PROMPT, model=model)
+
+        fact = _fact_from_data(data, raw_content)
+        store_cached_fact(cache_key, fact, model=model, source="text", temperature=0.7)
+        return fact
 
     except Exception as e:
         logger.error(f"Fact extraction failed: {e}")
@@ -153,3 +287,53 @@ async def extract_facts(raw_content: str, channel_description: str = "") -> Extr
             body=raw_content[:200] if raw_content else "An interesting fact",
             keywords=["interesting", "facts", "knowledge"],
         )
+
+
+async def extract_facts_batch(
+    raw_contents: list[str], channel_description: str = "",
+) -> list[Optional[ExtractedFact]]:
+    """
+    Extract facts for several raw contents with a single Gemini call.
+
+    Returns one entry per input, in order; an entry is None if Gemini
+    returned nothing usable for it. Cached inputs are not re-sent.
+    """
+    raw_contents = [_trim_raw_content(raw) for raw in raw_contents]
+    model = "gemini-2.5-flash"
+    results: list[Optional[ExtractedFact]] = [None] * len(raw_contents)
+    keys = [
+        extraction_cache.make_key(model, FACT_EXTRACTION_PROMPT, channel_description, raw)
+        for raw in raw_contents
+    ]
+
+    pending = []
+    for i, key in enumerate(keys):
+        results[i] = load_cached_fact(key)
+        if results[i] is None:
+            pending.append(i)
+
+    if not pending:
+        return results
+
+    logger.info(f"Extracting {len(pending)} facts with one Gemini call")
+    items = "\n\n".join(f"[{n}]\n{raw_contents[i]}" for n, i in enumerate(pending, 1))
+    prompt = FACT_EXTRACTION_BATCH_TAIL.format(
+        channel_context=_channel_context(channel_description),
+        count=len(pending),
+        items=items,
+    )
+
+    try:
+        data = await generate_fact_data(
+            prompt, cached_prefix=FACT_EXTRACTION_PROMPT, batch=True, model=model,
+        )
+
+        for i, item in zip(pending, data):
+            fact = _fact_from_data(item, raw_contents[i])
+            store_cached_fact(keys[i], fact, model=model, source="text", temperature=0.7)
+            results[i] = fact
+
+    except Exception as e:
+        logger.error(f"Batch fact extraction failed: {e}")
+
+    return results
@@ -0,0 +1,88 @@
+"""
+History DB — SQLite store behind video history and seen reddit posts.
+Stored in data/history.db (WAL mode), so adding an entry is a single
+INSERT instead of rewriting a whole JSON file.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DB_FILE = BASE_DIR / "data" / "history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    yt_title TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_video_history_channel ON video_history (channel, id);
+
+CREATE TABLE IF NOT EXISTS reddit_seen (
+    post_id TEXT PRIMARY KEY
+);
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+# One connection shared by the event loop and worker threads — serialize access
+_lock = threading.RLock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_FILE, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def query(sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+    """Run a SELECT and return all rows."""
+    with _lock:
+        return _connect().execute(sql, params).fetchall()
+
+
+def execute(sql: str, params: tuple = ()) -> None:
+    """Run a single write statement (autocommit)."""
+    with _lock:
+        _connect().execute(sql, params)
+
+
+def execute_many(statements: list[tuple[str, tuple]]) -> None:
+    """Run several write statements in one transaction."""
+    with _lock:
+        conn = _connect()
+        conn.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def insert_many(sql: str, rows: list[tuple]) -> None:
+    """executemany() in one transaction — used for one-time JSON imports."""
+    with _lock:
+        conn = _connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,36 @@
+"""
+HTTP Client — one pooled httpx.AsyncClient shared by the services.
+
+Reusing a client keeps connections (and their TLS sessions) alive between
+requests instead of paying a fresh connect + handshake every time.
+Timeouts can still be overridden per request via `timeout=`.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get (or lazily create) the shared AsyncClient."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
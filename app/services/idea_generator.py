@@ -3,29 +3,27 @@ Idea Generator — uses Gemini to generate multiple unique video ideas
 for a channel, avoiding duplicates from past videos.
 """
 
-import json
 import logging
 from typing import Optional
 
+import orjson
 from google.genai import types as genai_types
 
 from app.services.api_key_manager import get_key_manager
-from app.services.fact_extractor import ExtractedFact
+from app.services.fact_extractor import ExtractedFact, _enforce_body_length
 from app.services.video_history import get_past_titles
 
 logger = logging.getLogger(__name__)
 
+# Static instructions — identical on every call so Gemini can cache them.
+# The channel style, idea count and past topics go in IDEA_GENERATION_TAIL.
 IDEA_GENERATION_PROMPT = """You create viral fact/story ideas for a YouTube Shorts channel.
 
-{channel_context}
-
-Generate EXACTLY {count} unique, interesting ideas. Each should be a self-contained fact or story.
-
-AVOID these topics that were already covered:
-{past_topics}
+Generate EXACTLY the number of ideas requested at the end of this prompt. Each should be a self-contained fact or story.
+Follow the channel style if one is given, and AVOID the topics listed as already covered.
 
 Return ONLY a JSON array:
-[{{"title":"Short headline (3-6 words)","body":"The main fact — MUST be between 25 and 35 words long. Count carefully.","keywords":["visual_kw1","visual_kw2","visual_kw3"],"yt_title":"YouTube Shorts title (max 70 chars, emoji)","yt_description":"SHORT description — MAX 2-3 sentences only","yt_hashtags":["#tag1","#tag2","#tag3","#tag4","#tag5"]}}]
+[{"title":"Short headline (3-6 words)","body":"The main fact — MUST be between 25 and 35 words long. Count carefully.","keywords":["visual_kw1","visual_kw2","visual_kw3"],"yt_title":"YouTube Shorts title (max 70 chars, emoji)","yt_description":"SHORT description — MAX 2-3 sentences only","yt_hashtags":["#tag1","#tag2","#tag3","#tag4","#tag5"]}]
 
 CRITICAL: Each "body" MUST be between 25 and 35 words. Count every word carefully. If too long, shorten it. If too short, add descriptive details.
 
@@ -34,17 +32,42 @@ Rules:
 - Facts must be accurate
 - Make them viral-worthy and engaging
 - Keywords should be visual and concrete
-- Return ONLY the JSON array"""
+- Return ONLY the JSON array
+"""
 
+IDEA_GENERATION_TAIL = """
+{channel_context}
 
-async def generate_ideas(
-    channel_slug: str,
-    count: int = 10,
-    channel_description: str = "",
-) -> list[ExtractedFact]:
-    """Generate unique video ideas for a channel."""
-    logger.info(f"Generating {count} ideas for channel: {channel_slug}")
+Number of ideas: EXACTLY {count}
 
+Topics already covered (AVOID these):
+{past_topics}
+"""
+
+IDEA_GENERATION_BATCH_TAIL = """
+BATCH MODE: ideas are needed for {count} channels. Apply the instructions above to EACH channel section
+below separately (its own style, count and covered topics). Instead of a single array, return ONLY a
+JSON object mapping each channel id to its JSON array of ideas: {{"<channel id>": [...], ...}}
+
+{sections}
+"""
+
+
+def _from_item(item: dict) -> ExtractedFact:
+    """Build an ExtractedFact from one idea in Gemini's JSON array."""
+    get = item.get
+    return ExtractedFact(
+        title=get("title", ""),
+        body=_enforce_body_length(get("body", "")),
+        keywords=get("keywords") or [],
+        yt_title=get("yt_title", ""),
+        yt_description=get("yt_description", ""),
+        yt_hashtags=get("yt_hashtags") or [],
+    )
+
+
+def _channel_tail(channel_slug: str, count: int, channel_description: str) -> str:
+    """Per-channel part of the prompt: style, idea count and past topics."""
     past = get_past_titles(channel_slug, limit=30)
     past_text = "\n".join(f"- {t}" for t in past) if past else "None yet"
 
@@ -52,43 +75,52 @@ async def generate_ideas(
     if channel_description:
         channel_context = f"CHANNEL STYLE: {channel_description}"
 
-    prompt = IDEA_GENERATION_PROMPT.format(
+    return IDEA_GENERATION_TAIL.format(
         channel_context=channel_context,
         count=count,
         past_topics=past_text,
     )
 
+
+async def _generate_json(prompt: str):
+    """Send an idea prompt to Gemini and decode its JSON response."""
+    manager = get_key_manager()
+    response = await manager.gemini_generate(
+        model="gemini-2.5-flash",
+        contents=prompt,
+        config=genai_types.GenerateContentConfig(
+            temperature=0.9,
+            response_mime_type="application/json",
+        ),
+        cached_prefix=IDEA_GENERATION_PROMPT,
+    )
+
+    # Strip a markdown fence on the raw bytes (slices, no split copies)
+    raw = response.text.strip().encode()
+    if raw.startswith(b"```"):
+        start = raw.find(b"\n") + 1
+        end = raw.rfind(b"```")
+        # A truncated response has no closing fence (rfind finds the opening one)
+        raw = raw[start:end] if end >= start else raw[start:]
+
+    return orjson.loads(raw)
+
+
+async def generate_ideas(
+    channel_slug: str,
+    count: int = 10,
+    channel_description: str = "",
+) -> list[ExtractedFact]:
+    """Generate unique video ideas for a channel."""
+    logger.info(f"Generating {count} ideas for channel: {channel_slug}")
+
+    prompt = _channel_tail(channel_slug, count, channel_description)
+
     try:
-        manager = get_key_manager()
-        response = await manager.gemini_generate(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai_types.GenerateContentConfig(
-                temperature=0.9,
-                response_mime_type="application/json",
-            ),
-        )
-
-        text = response.text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-            text = text.rsplit("```", 1)[0]
-
-        ideas_data = json.loads(text)
-
-        if not isinstance(ideas_data, list):
-            ideas_data = [ideas_data]
-
-        ideas = []
-        for item in ideas_data[:count]:
-            ideas.append(ExtractedFact(
-                title=item.get("title", ""),
-                body=item.get("body", ""),
-                keywords=item.get("keywords", []),
-                yt_title=item.get("yt_title", ""),
-                yt_description=item.get("yt_description", ""),
-                yt_hashtags=item.get("yt_hashtags", []),
-            ))
+        ideas_data = await _generate_json(prompt)
+        ideas_data = ideas_data[:count] if isinstance(ideas_data, list) else [ideas_data]
+
+        ideas = [_from_item(item) for item in ideas_data]
 
         logger.info(f"Generated {len(ideas)} ideas")
         return ideas
@@ -96,3 +128,41 @@ async def generate_ideas(
     except Exception as e:
         logger.error(f"Idea generation failed: {e}")
         return []
+
+
+async def generate_ideas_batch(
+    requests: list[tuple[str, int, str]],
+) -> dict[str, list[ExtractedFact]]:
+    """
+    Generate ideas for several channels with a single Gemini call.
+
+    `requests` holds (channel_slug, count, channel_description) tuples.
+    Returns {channel_slug: ideas}; a channel Gemini skipped maps to [].
+    """
+    if len(requests) == 1:
+        slug, count, desc = requests[0]
+        return {slug: await generate_ideas(slug, count, desc)}
+
+    logger.info(f"Generating ideas for {len(requests)} channels in one call")
+
+    sections = "\n".join(
+        f"=== Channel id: {slug} ==={_channel_tail(slug, count, desc)}"
+        for slug, count, desc in requests
+    )
+    prompt = IDEA_GENERATION_BATCH_TAIL.format(count=len(requests), sections=sections)
+
+    results: dict[str, list[ExtractedFact]] = {slug: [] for slug, _, _ in requests}
+    try:
+        data = await _generate_json(prompt)
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+
+        for slug, count, _ in requests:
+            items = data.get(slug) or []
+            results[slug] = [_from_item(item) for item in items[:count]]
+            logger.info(f"Generated {len(results[slug])} ideas for {slug}")
+
+    except Exception as e:
+        logger.error(f"Batch idea generation failed: {e}")
+
+    return results
@@ -5,19 +5,34 @@ or falls back to Gemini image generation.
 Returns both image bytes AND source attribution (IG: @user, domain, etc.).
 """
 
+import asyncio
 import logging
+import random
 import re
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
 from urllib.parse import urlparse
 
-import httpx
+import orjson
 from google.genai import types as genai_types
+from selectolax.parser import HTMLParser
 
 from app.services.api_key_manager import get_key_manager
+from app.services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Compiled once — used for every search result
+_USERNAME_CLEAN_RE = re.compile(r"[^a-zA-Z0-9_.]")
+_AT_USERNAME_RE = re.compile(r"@([a-zA-Z0-9_.]{1,30})")
+# Fallback for Bing pages without a.iusc result links: murl:"..." is
+# HTML-escaped in attributes, raw in inline JSON
+_BING_MURL_RE = re.compile(r'murl(?:&quot;:&quot;(https?://[^&]+?)&quot;|":"(https?://[^"]+?)")')
+# Host of a candidate URL (minus "www.") without a full urlparse
+_HOST_RE = re.compile(r"^https?://(?:www\.)?([^/?#]+)")
+
 
 @dataclass
 class ImageResult:
@@ -39,6 +54,8 @@ SOCIAL_PLATFORMS = {
     "flickr.com": "Flickr",
     "youtube.com": "YouTube",
 }
+# One scan of the domain instead of a substring check per platform
+_SOCIAL_RE = re.compile("|".join(re.escape(d) for d in SOCIAL_PLATFORMS))
 
 
 def _build_source_attribution(display_link: str, page_title: str = "", page_url: str = "") -> str:
@@ -53,14 +70,16 @@ def _build_source_attribution(display_link: str, page_title: str = "", page_url:
     domain = display_link.lower().replace("www.", "")
 
     # Check if it's a social media platform
-    for social_domain, platform_name in SOCIAL_PLATFORMS.items():
-        if social_domain in domain:
-            # Try to extract username from the URL or title
-            username = _extract_username(page_url, page_title, social_domain)
-            if username:
-                return f"source: {platform_name}: @{username}"
-            else:
-                return f"source: {platform_name}"
+    match = _SOCIAL_RE.search(domain)
+    if match:
+        social_domain = match.group(0)
+        platform_name = SOCIAL_PLATFORMS[social_domain]
+        # Try to extract username from the URL or title
+        username = _extract_username(page_url, page_title, social_domain)
+        if username:
+            return f"source: {platform_name}: @{username}"
+        else:
+            return f"source: {platform_name}"
 
     # Regular website: use domain name
     return f"source: {domain}"
@@ -80,7 +99,7 @@ def _extract_username(url: str, title: str, domain: str) -> Optional[str]:
                         "video", "watch", "status", "hashtag", "search", "photo"}
                 if first.lower() not in skip and not first.startswith("_"):
                     # Clean up username
-                    username = re.sub(r"[^a-zA-Z0-9_.]", "", first)
+                    username = _USERNAME_CLEAN_RE.sub("", first)
                     if username and len(username) <= 30:
                         return username
         except Exception:
@@ -88,14 +107,74 @@ def _extract_username(url: str, title: str, domain: str) -> Optional[str]:
 
     # Try title: sometimes contains "@username" patterns
     if title:
-        at_match = re.search(r"@([a-zA-Z0-9_.]{1,30})", title)
+        at_match = _AT_USERNAME_RE.search(title)
         if at_match:
             return at_match.group(1)
 
     return None
 
 
+# LRU of recent results: normalized keywords -> (monotonic time, result).
+# Ideas in one batch often share visual keywords; this skips the repeat
+# searches and downloads. Bounded by entry count and total image bytes.
+_IMAGE_CACHE_TTL = 3600
+_IMAGE_CACHE_MAX_ENTRIES = 256
+_IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_image_cache: "OrderedDict[tuple[str, ...], tuple[float, ImageResult]]" = OrderedDict()
+_image_cache_bytes = 0
+
+
+def _image_cache_key(keywords: list[str]) -> tuple[str, ...]:
+    return tuple(sorted(k.strip().lower() for k in keywords[:5]))
+
+
+def _image_cache_get(key: tuple[str, ...]) -> Optional[ImageResult]:
+    global _image_cache_bytes
+    entry = _image_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, result = entry
+    if time.monotonic() - stored_at > _IMAGE_CACHE_TTL:
+        del _image_cache[key]
+        _image_cache_bytes -= len(result.image_bytes)
+        return None
+    _image_cache.move_to_end(key)
+    return result
+
+
+def _image_cache_put(key: tuple[str, ...], result: ImageResult) -> None:
+    global _image_cache_bytes
+    old = _image_cache.pop(key, None)
+    if old:
+        _image_cache_bytes -= len(old[1].image_bytes)
+    _image_cache[key] = (time.monotonic(), result)
+    _image_cache_bytes += len(result.image_bytes)
+    while _image_cache and (
+        len(_image_cache) > _IMAGE_CACHE_MAX_ENTRIES
+        or _image_cache_bytes > _IMAGE_CACHE_MAX_BYTES
+    ):
+        _, (_, evicted) = _image_cache.popitem(last=False)
+        _image_cache_bytes -= len(evicted.image_bytes)
+
+
 async def search_image(keywords: list[str]) -> Optional[ImageResult]:
+    """
+    Search for a relevant image, reusing a recent result for the same
+    keywords (case/order-insensitive) when there is one.
+    """
+    key = _image_cache_key(keywords)
+    cached = _image_cache_get(key)
+    if cached:
+        logger.info(f"Image cache hit for: {' '.join(key)}")
+        return cached
+
+    result = await _search_image_uncached(keywords)
+    if result:
+        _image_cache_put(key, result)
+    return result
+
+
+async def _search_image_uncached(keywords: list[str]) -> Optional[ImageResult]:
     """
     Search for a relevant image. Tries multiple sources in order:
     1. Google Custom Search (if configured)
@@ -130,6 +209,45 @@ async def search_image(keywords: list[str]) -> Optional[ImageResult]:
     return await _generate_image_with_gemini(keywords, manager)
 
 
+async def _first_image(
+    candidates: list[tuple[str, object]],
+    min_bytes: int,
+    timeout: float,
+    require_image_type: bool = False,
+) -> Optional[tuple[bytes, object]]:
+    """
+    Download all candidate (url, info) pairs concurrently and return
+    (content, info) for the highest-ranked one that looks like a usable
+    image. The remaining downloads are cancelled.
+    """
+    client = get_http_client()
+
+    async def _fetch(url: str, info: object) -> Optional[tuple[bytes, object]]:
+        try:
+            resp = await client.get(url, timeout=timeout)
+        except Exception:
+            return None
+        if resp.status_code != 200 or len(resp.content) <= min_bytes:
+            return None
+        if require_image_type and not resp.headers.get("content-type", "").startswith("image/"):
+            return None
+        return resp.content, info
+
+    tasks = [asyncio.create_task(_fetch(url, info)) for url, info in candidates]
+    try:
+        # Await in candidate order so the search ranking decides, not
+        # whichever host happens to answer first
+        for task in tasks:
+            result = await task
+            if result:
+                return result
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def _google_image_search(keywords: list[str], manager) -> Optional[ImageResult]:
     """Search Google Custom Search Images API with SafeSearch on."""
     try:
@@ -139,46 +257,46 @@ async def _google_image_search(keywords: list[str], manager) -> Optional[ImageRe
         cse_key = manager.get_cse_key()
         cse_cx = manager.get_cse_cx()
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                "https://www.googleapis.com/customsearch/v1",
-                params={
-                    "key": cse_key,
-                    "cx": cse_cx,
-                    "q": query,
-                    "searchType": "image",
-                    "safe": "active",
-                    "imgType": "photo",
-                    "imgSize": "large",
-                    "num": 5,
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_http_client().get(
+            "https://www.googleapis.com/customsearch/v1",
+            params={
+                "key": cse_key,
+                "cx": cse_cx,
+                "q": query,
+                "searchType": "image",
+                "safe": "active",
+                "imgType": "photo",
+                "imgSize": "large",
+                "num": 5,
+            },
+            timeout=30,
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         items = data.get("items", [])
         if not items:
             logger.warning("No images found via Google CSE")
             return None
 
+        candidates = []
         for item in items:
             image_url = item.get("link", "")
+            if not image_url:
+                continue
             display_link = item.get("displayLink", "")
             page_title = item.get("title", "")
             page_url = item.get("image", {}).get("contextLink", "")
-            if not image_url:
-                continue
-            try:
-                async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-                    img_resp = await client.get(image_url)
-                    if img_resp.status_code == 200 and len(img_resp.content) > 1000:
-                        source = _build_source_attribution(display_link, page_title, page_url)
-                        logger.info(f"Downloaded image — {source}")
-                        return ImageResult(image_bytes=img_resp.content, source=source)
-            except Exception:
-                continue
+            candidates.append((image_url, (display_link, page_title, page_url)))
 
-        return None
+        found = await _first_image(candidates, min_bytes=1000, timeout=15)
+        if not found:
+            return None
+
+        content, (display_link, page_title, page_url) = found
+        source = _build_source_attribution(display_link, page_title, page_url)
+        logger.info(f"Downloaded image — {source}")
+        return ImageResult(image_bytes=content, source=source)
     except Exception as e:
         logger.error(f"Google image search failed: {e}")
         return None
@@ -190,40 +308,37 @@ async def _pexels_image_search(keywords: list[str], api_key: str) -> Optional[Im
         query = " ".join(keywords[:5])
         logger.info(f"Searching Pexels photos for: {query}")
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                "https://api.pexels.com/v1/search",
-                params={"query": query, "per_page": 10, "size": "large"},
-                headers={"Authorization": api_key},
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_http_client().get(
+            "https://api.pexels.com/v1/search",
+            params={"query": query, "per_page": 10, "size": "large"},
+            headers={"Authorization": api_key},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         photos = data.get("photos", [])
         if not photos:
             return None
 
-        import random
         random.shuffle(photos)
 
+        candidates = []
         for photo in photos[:5]:
             img_url = photo.get("src", {}).get("large2x") or photo.get("src", {}).get("large")
-            if not img_url:
-                continue
-            try:
-                photographer = photo.get("photographer", "Pexels")
-                async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-                    img_resp = await client.get(img_url)
-                    if img_resp.status_code == 200 and len(img_resp.content) > 1000:
-                        logger.info(f"Got Pexels image by {photographer}")
-                        return ImageResult(
-                            image_bytes=img_resp.content,
-                            source=f"source: Pexels / {photographer}",
-                        )
-            except Exception:
-                continue
+            if img_url:
+                candidates.append((img_url, photo.get("photographer", "Pexels")))
 
-        return None
+        found = await _first_image(candidates, min_bytes=1000, timeout=15)
+        if not found:
+            return None
+
+        content, photographer = found
+        logger.info(f"Got Pexels image by {photographer}")
+        return ImageResult(
+            image_bytes=content,
+            source=f"source: Pexels / {photographer}",
+        )
     except Exception as e:
         logger.error(f"Pexels image search failed: {e}")
         return None
@@ -247,6 +362,27 @@ STOCK_DOMAINS = {
 }
 
 
+def _bing_image_urls(html: str) -> list[str]:
+    """Full-size image URLs from a Bing results page, in page order."""
+    # Each result is <a class="iusc" m="{...json...}"> with the image URL in "murl"
+    urls = []
+    for node in HTMLParser(html).css("a.iusc"):
+        meta = node.attributes.get("m")
+        if not meta:
+            continue
+        try:
+            murl = orjson.loads(meta).get("murl")
+        except orjson.JSONDecodeError:
+            continue
+        if murl and murl.startswith(("http://", "https://")):
+            urls.append(murl)
+    if urls:
+        return urls
+
+    # Markup changed? Scan the raw page instead (both murl forms, one pass)
+    return [escaped or raw for escaped, raw in _BING_MURL_RE.findall(html)]
+
+
 async def _bing_image_search(keywords: list[str]) -> Optional[ImageResult]:
     """
     Search Bing Images without an API key (scraping public results).
@@ -254,8 +390,6 @@ async def _bing_image_search(keywords: list[str]) -> Optional[ImageResult]:
     Filters out stock photo sites to avoid watermarked images.
     """
     try:
-        import random
-
         query = " ".join(keywords[:5])
         logger.info(f"Searching Bing Images for: {query}")
 
@@ -265,29 +399,23 @@ async def _bing_image_search(keywords: list[str]) -> Optional[ImageResult]:
             "Accept": "text/html,application/xhtml+xml",
         }
 
-        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
-            resp = await client.get(
-                "https://www.bing.com/images/search",
-                params={
-                    "q": query,
-                    "first": 1,
-                    "count": 30,
-                    "safesearch": "Strict",
-                    "qft": "+filterui:imagesize-large",
-                },
-                headers=headers,
-            )
+        resp = await get_http_client().get(
+            "https://www.bing.com/images/search",
+            params={
+                "q": query,
+                "first": 1,
+                "count": 30,
+                "safesearch": "Strict",
+                "qft": "+filterui:imagesize-large",
+            },
+            headers=headers,
+            timeout=30,
+        )
 
         if resp.status_code != 200:
             return None
 
-        # Extract image URLs from the HTML using murl pattern
-        import re
-        # Bing puts image URLs in murl:"..." attributes
-        urls = re.findall(r'murl&quot;:&quot;(https?://[^&]+?)&quot;', resp.text)
-        if not urls:
-            # Alternate pattern
-            urls = re.findall(r'murl":"(https?://[^"]+?)"', resp.text)
+        urls = _bing_image_urls(resp.text)
 
         if not urls:
             logger.warning("No Bing image URLs found")
@@ -297,29 +425,29 @@ async def _bing_image_search(keywords: list[str]) -> Optional[ImageResult]:
         urls = list(dict.fromkeys(urls))  # Preserve order, remove dupes
         random.shuffle(urls)
 
+        candidates = []
         for img_url in urls[:15]:
-            try:
-                domain = urlparse(img_url).netloc.replace("www.", "")
-
-                # Skip stock photo sites (watermarked images)
-                if any(stock in domain for stock in STOCK_DOMAINS):
-                    logger.debug(f"Skipping stock image from: {domain}")
-                    continue
-
-                async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-                    img_resp = await client.get(img_url)
-                    if (img_resp.status_code == 200
-                            and len(img_resp.content) > 2000
-                            and img_resp.headers.get("content-type", "").startswith("image/")):
-                        logger.info(f"Got Bing image from {domain}")
-                        return ImageResult(
-                            image_bytes=img_resp.content,
-                            source=f"source: {domain}",
-                        )
-            except Exception:
+            host = _HOST_RE.match(img_url)
+            domain = host.group(1) if host else img_url
+
+            # Skip stock photo sites (watermarked images)
+            if any(stock in domain for stock in STOCK_DOMAINS):
+                logger.debug(f"Skipping stock image from: {domain}")
                 continue
+            candidates.append((img_url, domain))
 
-        return None
+        found = await _first_image(
+            candidates[:8], min_bytes=2000, timeout=10, require_image_type=True,
+        )
+        if not found:
+            return None
+
+        content, domain = found
+        logger.info(f"Got Bing image from {domain}")
+        return ImageResult(
+            image_bytes=content,
+            source=f"source: {domain}",
+        )
     except Exception as e:
         logger.error(f"Bing image search failed: {e}")
         return None
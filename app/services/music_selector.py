@@ -8,6 +8,7 @@ Sound modes:
 """
 
 import logging
+import os
 import random
 from pathlib import Path
 from typing import Optional
@@ -18,6 +19,23 @@ logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {".mp3", ".wav", ".ogg", ".m4a", ".aac"}
 
+# (directory mtime, music files) — rescanned only when files are added/removed
+_music_cache: Optional[tuple[int, list[Path]]] = None
+
+
+def _list_music_files() -> list[Path]:
+    """List music files in MUSIC_DIR, cached until the directory changes."""
+    global _music_cache
+    mtime = MUSIC_DIR.stat().st_mtime_ns
+    if _music_cache is None or _music_cache[0] != mtime:
+        with os.scandir(MUSIC_DIR) as entries:
+            files = [
+                MUSIC_DIR / entry.name for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS
+            ]
+        _music_cache = (mtime, files)
+    return _music_cache[1]
+
 
 def select_music(sound_mode: str = "random", sound_file: Optional[str] = None) -> Optional[str]:
     """
@@ -43,10 +61,7 @@ def select_music(sound_mode: str = "random", sound_file: Optional[str] = None) -
             logger.warning(f"Specific music file not found: {sound_file}, falling back to random")
 
     # Random mode (or fallback)
-    music_files = [
-        f for f in MUSIC_DIR.iterdir()
-        if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
+    music_files = _list_music_files()
 
     if not music_files:
         logger.warning(
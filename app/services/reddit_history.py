@@ -1,56 +1,101 @@
 """
 Reddit History — tracks past scraped reddit posts to avoid duplicates.
-Stored in data/reddit_history.json.
+Stored in the reddit_seen table of data/history.db (see history_db), with an
+in-memory set in front so membership checks never touch the database.
 """
 
-import json
 import logging
 from pathlib import Path
+from typing import Optional
+
+import orjson
+
+from app.services import history_db
 
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-HISTORY_FILE = BASE_DIR / "data" / "reddit_history.json"
+LEGACY_NDJSON_FILE = BASE_DIR / "data" / "reddit_history.ndjson"
+LEGACY_JSON_FILE = BASE_DIR / "data" / "reddit_history.json"
+
+MAX_SEEN = 5000  # IDs kept after pruning
+PRUNE_AT = 10000  # rows in the table before old IDs are pruned
+
+# Exact membership set, loaded once from the table. At a few thousand short
+# IDs this is smaller and faster than a Bloom filter + DB confirmation.
+_seen: Optional[set[str]] = None
 
 
-def _read_history() -> dict:
-    """Read history from disk."""
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to read reddit history: {e}")
-    return {"seen_posts": []}
+def _legacy_ids() -> list[str]:
+    """IDs from the older file-based stores, oldest first."""
+    if LEGACY_NDJSON_FILE.exists():
+        with open(LEGACY_NDJSON_FILE, "r", encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+    if LEGACY_JSON_FILE.exists():
+        return orjson.loads(LEGACY_JSON_FILE.read_bytes()).get("seen_posts", [])
+    return []
 
 
-def _write_history(data: dict) -> None:
-    """Write history to disk."""
-    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+def _load_seen() -> set[str]:
+    """Load seen IDs on first use, importing any legacy history file."""
+    global _seen
+    if _seen is not None:
+        return _seen
+
     try:
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        legacy = _legacy_ids()
+        if legacy:
+            history_db.insert_many(
+                "INSERT OR IGNORE INTO reddit_seen (post_id) VALUES (?)",
+                [(post_id,) for post_id in legacy[-MAX_SEEN:]],
+            )
+            for path in (LEGACY_NDJSON_FILE, LEGACY_JSON_FILE):
+                if path.exists():
+                    path.rename(path.with_name(path.name + ".migrated"))
+            logger.info(f"Migrated {len(legacy[-MAX_SEEN:])} reddit history entries to SQLite")
     except Exception as e:
-        logger.error(f"Failed to write reddit history: {e}")
+        logger.error(f"Failed to migrate reddit history: {e}")
+
+    try:
+        _seen = {row["post_id"] for row in history_db.query("SELECT post_id FROM reddit_seen")}
+    except Exception as e:
+        logger.error(f"Failed to read reddit history: {e}")
+        _seen = set()
+    return _seen
 
 
 def is_post_seen(post_id: str) -> bool:
     """Check if a reddit post has been processed before."""
-    data = _read_history()
-    return post_id in data.get("seen_posts", [])
+    return post_id in _load_seen()
 
 
 def mark_post_seen(post_id: str) -> None:
     """Mark a reddit post as processed. Keeps the last 5000 IDs to avoid unbounded growth."""
-    data = _read_history()
-    seen = data.get("seen_posts", [])
-    
-    if post_id not in seen:
-        seen.append(post_id)
-        
-        # Limit history size to prevent file bloat
-        if len(seen) > 5000:
-            seen = seen[-5000:]
-            
-        data["seen_posts"] = seen
-        _write_history(data)
+    mark_posts_seen([post_id])
+
+
+def mark_posts_seen(post_ids: list[str]) -> None:
+    """Mark several reddit posts as processed in one transaction."""
+    global _seen
+    seen = _load_seen()
+    new_ids = [post_id for post_id in dict.fromkeys(post_ids) if post_id not in seen]
+    if not new_ids:
+        return
+
+    seen.update(new_ids)
+    try:
+        history_db.insert_many(
+            "INSERT OR IGNORE INTO reddit_seen (post_id) VALUES (?)",
+            [(post_id,) for post_id in new_ids],
+        )
+
+        # Limit history size to prevent table bloat (rowid order = insertion order)
+        if len(seen) > PRUNE_AT:
+            history_db.execute(
+                "DELETE FROM reddit_seen WHERE rowid NOT IN "
+                "(SELECT rowid FROM reddit_seen ORDER BY rowid DESC LIMIT ?)",
+                (MAX_SEEN,),
+            )
+            _seen = None
+    except Exception as e:
+        logger.error(f"Failed to write reddit history: {e}")
@@ -5,13 +5,16 @@ Uses the official Reddit API via OAuth for reliability and cycle-able credential
 """
 
 import aiohttp
+import orjson
 import asyncio
+import itertools
 import logging
 import random
+import re
 from typing import Optional
 
 from app.services.fact_extractor import ExtractedFact
-from app.services.reddit_history import is_post_seen, mark_post_seen
+from app.services.reddit_history import is_post_seen, mark_posts_seen
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +27,52 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 Safari/605.1.15",
 ]
 
+# Body clipping: the first 50 words, and a check for "at least 15 words",
+# each found in a single regex scan instead of splitting the whole body
+_CLIP_RE = re.compile(r"\s*(?:\S+\s+){49}\S+")
+_MIN_WORDS_RE = re.compile(r"\s*(?:\S+\s+){14}\S")
+
+
 def _get_random_user_agent() -> str:
     return random.choice(USER_AGENTS)
 
 
+# Shared session so repeated scrapes reuse keep-alive connections instead of a
+# fresh TCP+TLS handshake per request. User-Agents still rotate per request,
+# and cookies are not kept, so each request looks as independent as before.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Get (or lazily create) the shared aiohttp session."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=75),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            timeout=aiohttp.ClientTimeout(total=30, connect=5, sock_read=15),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared session (called on app shutdown)."""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+def _is_viable(post: dict) -> bool:
+    """Cheap checks to drop posts before building an ExtractedFact for them."""
+    if post.get("stickied") or post.get("over_18"):
+        return False
+    title = post.get("title")
+    if not title:
+        return False
+    return len(post.get("selftext") or title) >= 20
+
+
 def _format_fact_from_post(post: dict) -> ExtractedFact:
     """Format a Reddit post into an ExtractedFact ready for generation."""
     title = post.get("title", "")
@@ -41,10 +86,11 @@ def _format_fact_from_post(post: dict) -> ExtractedFact:
     # Trim body to fit within constraints of a short video body if necessary
     # (Though we rely on video generator TTS not Gemini for exact word counts here, 
     # it's usually good to keep it relatively brief)
-    words = body.split()
-    if len(words) > 50:
-        body = " ".join(words[:50]) + "..."
-    if len(words) < 15 and body != title:
+    short = not _MIN_WORDS_RE.match(body)
+    m = _CLIP_RE.match(body)
+    if m and m.end() < len(body.rstrip()):
+        body = m.group(0) + "..."
+    if short and body != title:
         body = f"{title}. {body}"
 
     # Generate visually descriptive mockup properties
@@ -69,56 +115,50 @@ async def _scrape_pullpush_api(subreddits: list[str], count: int) -> list[dict]:
     
     logger.info(f"Falling back to PullPush API: {url}")
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers={"User-Agent": "YouTubeShortsBot/1.0", "Accept": "application/json"}) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data.get("data", [])
-                else:
-                    logger.warning(f"PullPush API failed with status {resp.status}")
+        session = await _get_session()
+        async with session.get(url, headers={"User-Agent": "YouTubeShortsBot/1.0", "Accept": "application/json"}) as resp:
+            if resp.status == 200:
+                data = orjson.loads(await resp.read())
+                return data.get("data", [])
+            else:
+                logger.warning(f"PullPush API failed with status {resp.status}")
     except Exception as e:
         logger.error(f"PullPush API error: {e}")
     return []
 
 
-async def scrape_reddit_ideas(subreddits: list[str], count: int = 10) -> list[ExtractedFact]:
-    """
-    Scrape top/hot posts from the provided subreddits using standard JSON endpoints.
-    Filters out duplicates using reddit_history.
-    """
-    if not subreddits:
-        logger.warning("No subreddits provided for Reddit scraper.")
-        return []
+# Max concurrent subreddit requests — enough to overlap latency without
+# tripping Reddit's 429 rate limiting
+MAX_CONCURRENT_FETCHES = 5
 
-    # Rotate User-Agents to prevent instant HTTP 429 blocks
-    headers = {
-        "User-Agent": _get_random_user_agent(),
-        "Accept": "application/json"
-    }
 
-    ideas = []
-    # Mix subreddits or query them jointly (e.g., "r/AskReddit+todayilearned")
-    subs_joined = "+".join(subreddits)
-    # Fetch more than we need to account for duplicates and stickies
-    fetch_limit = min(max(count * 3, 25), 100) 
-    
-    logger.info(f"Scraping {fetch_limit} posts from r/{subs_joined} (No-API mode)...")
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before the next attempt: the server's Retry-After on a 429,
+    otherwise exponential backoff plus up to 1s of jitter, capped at 30s.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return min(30.0, 1 + 2 ** attempt * 0.5 + random.random())
 
-    # Fetch proxy from key manager
-    from app.services.api_key_manager import get_key_manager
-    km = get_key_manager()
-    proxy_url = km.get_key("reddit_proxy") if km else None
-    if proxy_url:
-        logger.info("Using configured Reddit Proxy")
 
+async def _fetch_subreddit(
+    subreddit: str, fetch_limit: int, proxy_url: Optional[str], sem: asyncio.Semaphore,
+) -> Optional[list[dict]]:
+    """
+    Fetch hot posts for one subreddit, with retries.
+    Returns the post dicts, or None if every attempt failed.
+    """
     max_retries = 3
-    success = False
     for attempt in range(max_retries):
         try:
             # Alternate between www and old domains per attempt to bypass blocks
             domain = "www.reddit.com" if attempt % 2 == 0 else "old.reddit.com"
-            url = f"https://{domain}/r/{subs_joined}/hot.json?limit={fetch_limit}"
-            
+            url = f"https://{domain}/r/{subreddit}/hot.json?limit={fetch_limit}"
+
             # Use full browser headers to prevent HTTP 403/429 blocks
             headers = {
                 "User-Agent": _get_random_user_agent(),
@@ -130,72 +170,114 @@ async def scrape_reddit_ideas(subreddits: list[str], count: int = 10) -> list[Ex
                 "Sec-Fetch-User": "?1",
                 "Upgrade-Insecure-Requests": "1"
             }
-            
+
             kwargs = {}
             if proxy_url:
                 kwargs["proxy"] = proxy_url
-            
-            async with aiohttp.ClientSession() as session:
+
+            session = await _get_session()
+            async with sem:
                 async with session.get(url, headers=headers, **kwargs) as resp:
                     content_type = resp.headers.get("Content-Type", "")
-                    
+
                     if resp.status == 200 and "application/json" in content_type:
-                        data = await resp.json()
-                        posts = data.get("data", {}).get("children", [])
-                        
-                        for child in posts:
-                            post_data = child.get("data", {})
-                            post_id = post_data.get("id")
-                            
-                            # Skip pinned stickies
-                            if post_data.get("stickied"):
-                                continue
-                                
-                            # Skip if already seen
-                            if is_post_seen(post_id):
-                                continue
-                                
-                            fact = _format_fact_from_post(post_data)
-                            if fact:
-                                ideas.append(fact)
-                                mark_post_seen(post_id)
-                                
-                            if len(ideas) >= count:
-                                break
-                        
-                        # If we successfully parsed JSON, exit retry loop
-                        success = True
-                        break
-                    else:
-                        text = await resp.text()
-                        logger.warning(
-                            f"Reddit API request failed (Attempt {attempt+1}/{max_retries}): "
-                            f"Status {resp.status}, Content-Type: {content_type}"
-                        )
-                        if attempt < max_retries - 1:
-                            delay = random.uniform(1.5, 3.5)
-                            logger.info(f"Retrying in {delay:.1f} seconds...")
-                            await asyncio.sleep(delay)
-                        
+                        data = orjson.loads(await resp.read())
+                        children = data.get("data", {}).get("children", [])
+                        return [child.get("data", {}) for child in children]
+
+            logger.warning(
+                f"Reddit request for r/{subreddit} failed (Attempt {attempt+1}/{max_retries}): "
+                f"Status {resp.status}, Content-Type: {content_type}"
+            )
+            if attempt < max_retries - 1:
+                retry_after = resp.headers.get("Retry-After") if resp.status == 429 else None
+                delay = _retry_delay(attempt, retry_after)
+                logger.info(f"Retrying r/{subreddit} in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+
         except Exception as e:
-            logger.error(f"Error scraping Reddit on attempt {attempt+1}: {e}")
+            logger.error(f"Error scraping r/{subreddit} on attempt {attempt+1}: {e}")
             if attempt < max_retries - 1:
-                await asyncio.sleep(2)
-                
+                await asyncio.sleep(_retry_delay(attempt))
+
+    return None
+
+
+async def scrape_reddit_ideas(subreddits: list[str], count: int = 10) -> list[ExtractedFact]:
+    """
+    Scrape top/hot posts from the provided subreddits using standard JSON endpoints.
+    Subreddits are fetched concurrently (bounded) and their posts interleaved.
+    Filters out duplicates using reddit_history.
+    """
+    if not subreddits:
+        logger.warning("No subreddits provided for Reddit scraper.")
+        return []
+
+    ideas = []
+    # Fetch more than we need to account for duplicates and stickies
+    fetch_limit = min(max(count * 3, 25), 100)
+
+    logger.info(f"Scraping {fetch_limit} posts each from {len(subreddits)} subreddits (No-API mode)...")
+
+    # Fetch proxy from key manager
+    from app.services.api_key_manager import get_key_manager
+    km = get_key_manager()
+    proxy_url = km.get_key("reddit_proxy") if km else None
+    if proxy_url:
+        logger.info("Using configured Reddit Proxy")
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    results = await asyncio.gather(
+        *[_fetch_subreddit(sub, fetch_limit, proxy_url, sem) for sub in subreddits],
+        return_exceptions=True,
+    )
+    feeds = [r for r in results if isinstance(r, list)]
+    success = bool(feeds)
+
+    # Round-robin across subreddits so one busy sub doesn't crowd out the rest
+    seen_ids = set()
+    new_ids = []  # marked seen in one write at the end
+    for group in itertools.zip_longest(*feeds):
+        if len(ideas) >= count:
+            break
+        for post_data in group:
+            if post_data is None:
+                continue
+            post_id = post_data.get("id")
+
+            # Skip non-viable posts and cross-subreddit duplicates
+            if not _is_viable(post_data) or post_id in seen_ids:
+                continue
+            seen_ids.add(post_id)
+
+            # Skip if already seen
+            if is_post_seen(post_id):
+                continue
+
+            fact = _format_fact_from_post(post_data)
+            if fact:
+                ideas.append(fact)
+                new_ids.append(post_id)
+
+            if len(ideas) >= count:
+                break
+
     # Fallback to PullPush if direct scraping completely failed
     if not success and len(ideas) < count:
         logger.warning("Direct Reddit scraping failed. Attempting PullPush API fallback...")
         pullpush_posts = await _scrape_pullpush_api(subreddits, count)
         for post_data in pullpush_posts:
             post_id = post_data.get("id")
-            if is_post_seen(post_id): continue
+            if not _is_viable(post_data) or post_id in seen_ids or is_post_seen(post_id): continue
+            seen_ids.add(post_id)
                 
             fact = _format_fact_from_post(post_data)
             if fact:
                 ideas.append(fact)
-                mark_post_seen(post_id)
+                new_ids.append(post_id)
                 
             if len(ideas) >= count: break
 
+    mark_posts_seen(new_ids)
     logger.info(f"Reddit Scraper collected {len(ideas)} new ideas.")
     return ideas
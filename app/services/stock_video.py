@@ -3,16 +3,23 @@ Stock Video — fetches calm background videos from Pexels API.
 Caches downloads to avoid re-fetching.
 """
 
+import asyncio
 import logging
+import os
 import random
 import shutil
+import stat
+import time
 from pathlib import Path
 from typing import Optional
 
 import httpx
+import orjson
 
 from app.config import BACKGROUNDS_DIR, CHANNELS_DIR
 from app.services.api_key_manager import get_key_manager
+from app.services.http_client import get_http_client
+from app.services.video_assembler import PREPARED_SUFFIX, prepare_background
 
 logger = logging.getLogger(__name__)
 
@@ -30,27 +37,77 @@ SEARCH_QUERIES = [
 ]
 
 
+# (directory mtime, cached background videos) — rescanned only when files change
+_backgrounds_cache: Optional[tuple[int, list[Path]]] = None
+
+# Pexels search results per query, persisted so restarts don't re-hit the API
+SEARCH_CACHE_FILE = BACKGROUNDS_DIR / ".search_cache.json"
+SEARCH_CACHE_TTL = 3600  # seconds
+_search_cache: Optional[dict[str, tuple[float, list]]] = None
+
+# Max concurrent Pexels search+download sections, to spare bandwidth and API quota
+_PEXELS_SEM = asyncio.Semaphore(3)
+
+# In-flight fetches per channel, so concurrent pipelines for one channel share
+# a single download/preprocess instead of racing on the same files
+_inflight: dict[str, asyncio.Task] = {}
+
+
 async def fetch_background_video(channel_slug: str) -> Optional[str]:
     """
     Fetch a calming background video from Pexels.
-    Caches it per-channel to ensure consistency.
-    Returns the file path to the downloaded video.
+    Caches it per-channel to ensure consistency, along with a copy already
+    scaled/cropped to the output format (see video_assembler.prepare_background).
+    Returns the file path to the prepared video, or the raw one if preparing failed.
     """
+    task = _inflight.get(channel_slug)
+    if task is None:
+        task = asyncio.create_task(_fetch_background_video(channel_slug))
+        _inflight[channel_slug] = task
+        task.add_done_callback(lambda _: _inflight.pop(channel_slug, None))
+    # Shield so one cancelled caller doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_background_video(channel_slug: str) -> Optional[str]:
     channel_dir = CHANNELS_DIR / channel_slug
     channel_dir.mkdir(parents=True, exist_ok=True)
     channel_bg = channel_dir / "background.mp4"
+    prepared = channel_dir / f"background{PREPARED_SUFFIX}"
+    had_background = channel_bg.exists()
+
+    raw_path = await _fetch_raw_background(channel_bg)
+    if not raw_path:
+        return None
+
+    # Reuse the prepared copy unless the raw background is new or was replaced
+    # (a linked or copied background keeps the source mtime, hence "had_background")
+    if (
+        had_background
+        and prepared.exists()
+        and prepared.stat().st_mtime >= channel_bg.stat().st_mtime
+    ):
+        return str(prepared)
+
+    logger.info(f"Preparing background video: {prepared}")
+    if await asyncio.to_thread(prepare_background, raw_path, str(prepared)):
+        return str(prepared)
+    return raw_path
+
 
+async def _fetch_raw_background(channel_bg: Path) -> Optional[str]:
+    """Get the channel's raw background video, downloading one if needed."""
     # 1. If this channel already has a cached background, always use it
     if channel_bg.exists():
         logger.info(f"Using channel cached background: {channel_bg}")
         return str(channel_bg)
 
     # 2. Check if we already have global cached background videos
-    cached = list(BACKGROUNDS_DIR.glob("*.mp4"))
+    cached = _list_backgrounds()
     if cached and len(cached) >= 3:
         choice = random.choice(cached)
         logger.info(f"Using globally cached background: {choice.name}")
-        shutil.copy2(choice, channel_bg)
+        _link_or_copy(choice, channel_bg)
         return str(channel_bg)
 
     # 3. Fetch a new video from Pexels
@@ -63,81 +120,164 @@ async def fetch_background_video(channel_slug: str) -> Optional[str]:
     query = random.choice(SEARCH_QUERIES)
     logger.info(f"Fetching background video from Pexels: '{query}'")
 
-    try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.get(
-                "https://api.pexels.com/videos/search",
-                params={
-                    "query": query,
-                    "orientation": "portrait",
-                    "size": "medium",
-                    "per_page": 15,
-                },
-                headers={"Authorization": pexels_key},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-        videos = data.get("videos", [])
-        if not videos:
-            logger.warning("No videos found on Pexels")
-            return _fallback_cached(channel_bg)
+    # Bound concurrent Pexels searches/downloads across channels
+    async with _PEXELS_SEM:
+        try:
+            client = get_http_client()
+            videos = await _search_videos(client, query, pexels_key)
+            if not videos:
+                logger.warning("No videos found on Pexels")
+                return _fallback_cached(channel_bg)
 
-        # Pick a random video from results
-        random.shuffle(videos)
-
-        for video in videos:
-            video_files = video.get("video_files", [])
-            # Prefer HD portrait files
-            suitable = [
-                vf for vf in video_files
-                if vf.get("height", 0) >= 1080
-                and vf.get("width", 0) <= vf.get("height", 0)  # portrait
-                and vf.get("file_type") == "video/mp4"
-            ]
-            if not suitable:
-                # Accept any MP4
+            # Pick a random video from results
+            random.shuffle(videos)
+
+            for video in videos:
+                video_files = video.get("video_files", [])
+                # Prefer HD portrait files
                 suitable = [
                     vf for vf in video_files
-                    if vf.get("file_type") == "video/mp4"
+                    if vf.get("height", 0) >= 1080
+                    and vf.get("width", 0) <= vf.get("height", 0)  # portrait
+                    and vf.get("file_type") == "video/mp4"
                 ]
-            if not suitable:
-                continue
-
-            # Pick the best quality
-            suitable.sort(key=lambda x: x.get("height", 0), reverse=True)
-            video_url = suitable[0].get("link")
-            if not video_url:
-                continue
-
-            # Download
-            logger.info(f"Downloading video: {video_url}")
-            async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
-                dl_resp = await client.get(video_url)
-                if dl_resp.status_code == 200:
-                    channel_bg.write_bytes(dl_resp.content)
-                    
+                if not suitable:
+                    # Accept any MP4
+                    suitable = [
+                        vf for vf in video_files
+                        if vf.get("file_type") == "video/mp4"
+                    ]
+                if not suitable:
+                    continue
+
+                # Pick the best quality
+                suitable.sort(key=lambda x: x.get("height", 0), reverse=True)
+                video_url = suitable[0].get("link")
+                if not video_url:
+                    continue
+
+                # Download
+                logger.info(f"Downloading video: {video_url}")
+                if await _download_to(client, video_url, channel_bg):
                     # Also save to global cache
                     video_id = video.get("id", random.randint(1000, 9999))
                     output_path = BACKGROUNDS_DIR / f"pexels_{video_id}.mp4"
-                    shutil.copy2(channel_bg, output_path)
+                    _link_or_copy(channel_bg, output_path)
 
                     logger.info(f"Saved background video: {channel_bg}")
                     return str(channel_bg)
 
-        logger.warning("Could not download any Pexels video")
-        return _fallback_cached(channel_bg)
+            logger.warning("Could not download any Pexels video")
+            return _fallback_cached(channel_bg)
 
-    except Exception as e:
-        logger.error(f"Pexels API error: {e}")
-        return _fallback_cached(channel_bg)
+        except Exception as e:
+            logger.error(f"Pexels API error: {e}")
+            return _fallback_cached(channel_bg)
+
+
+def _list_backgrounds() -> list[Path]:
+    """List videos in BACKGROUNDS_DIR, cached until the directory changes."""
+    global _backgrounds_cache
+    mtime = BACKGROUNDS_DIR.stat().st_mtime_ns
+    if _backgrounds_cache is None or _backgrounds_cache[0] != mtime:
+        with os.scandir(BACKGROUNDS_DIR) as entries:
+            files = [
+                BACKGROUNDS_DIR / entry.name for entry in entries
+                if entry.is_file() and entry.name.endswith(".mp4")
+            ]
+        _backgrounds_cache = (mtime, files)
+    return _backgrounds_cache[1]
+
+
+def _load_search_cache() -> dict[str, tuple[float, list]]:
+    """Load persisted Pexels search results on first use."""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = {}
+        try:
+            if SEARCH_CACHE_FILE.exists():
+                raw = orjson.loads(SEARCH_CACHE_FILE.read_bytes())
+                _search_cache = {q: (ts, videos) for q, (ts, videos) in raw.items()}
+        except Exception as e:
+            logger.warning(f"Failed to read Pexels search cache: {e}")
+    return _search_cache
+
+
+async def _search_videos(client: httpx.AsyncClient, query: str, pexels_key: str) -> list[dict]:
+    """Search Pexels for portrait videos, reusing results for the same query within the TTL."""
+    cache = _load_search_cache()
+    entry = cache.get(query)
+    if entry and time.time() - entry[0] < SEARCH_CACHE_TTL:
+        logger.info(f"Using cached Pexels results for '{query}'")
+        return list(entry[1])
+
+    resp = await client.get(
+        "https://api.pexels.com/videos/search",
+        params={
+            "query": query,
+            "orientation": "portrait",
+            "size": "medium",
+            "per_page": 15,
+        },
+        headers={"Authorization": pexels_key},
+        timeout=60,
+    )
+    resp.raise_for_status()
+    videos = orjson.loads(resp.content).get("videos", [])
+
+    if videos:
+        cache[query] = (time.time(), videos)
+        try:
+            SEARCH_CACHE_FILE.write_bytes(orjson.dumps(cache))
+        except OSError as e:
+            logger.warning(f"Failed to write Pexels search cache: {e}")
+    return list(videos)
+
+
+async def _download_to(client: httpx.AsyncClient, url: str, path: Path) -> bool:
+    """
+    Stream a download to disk in chunks instead of buffering the whole file.
+    Written to a .part file first so a failed download never leaves a
+    truncated video behind in the cache.
+    """
+    part_path = path.with_suffix(path.suffix + ".part")
+    try:
+        async with client.stream("GET", url, timeout=120) as dl_resp:
+            if dl_resp.status_code != 200:
+                return False
+            with open(part_path, "wb") as f:
+                async for chunk in dl_resp.aiter_bytes(chunk_size=65536):
+                    f.write(chunk)
+        os.replace(part_path, path)
+        return True
+    except Exception:
+        part_path.unlink(missing_ok=True)
+        raise
 
 
 def _fallback_cached(channel_bg: Path) -> Optional[str]:
     """Fall back to any cached background video."""
-    cached = list(BACKGROUNDS_DIR.glob("*.mp4"))
+    cached = _list_backgrounds()
     if cached:
         choice = random.choice(cached)
-        shutil.copy2(choice, channel_bg)
+        _link_or_copy(choice, channel_bg)
         return str(channel_bg)
     return None
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Share a cached background between the global cache and a channel by
+    hardlinking it (no bytes copied), falling back to a copy across
+    filesystems. Shared files are only ever replaced, never written in place.
+    """
+    try:
+        dst.unlink(missing_ok=True)
+    except PermissionError:
+        # Older versions left these read-only, which blocks unlink on Windows
+        dst.chmod(stat.S_IWRITE | stat.S_IREAD)
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
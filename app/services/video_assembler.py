@@ -9,7 +9,10 @@ Layers (bottom to top):
 Output: MP4 (H.264 + AAC), exactly 5 seconds.
 """
 
+import asyncio
+import functools
 import logging
+import os
 import subprocess
 import tempfile
 import uuid
@@ -20,8 +23,121 @@ from app.config import VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
 
+# H.264 encoders in order of preference, with their quality/speed arguments.
+# Hardware encoders offload the encode to the GPU/media engine; libx264 is the
+# always-available software fallback.
+_ENCODER_ARGS = {
+    "h264_nvenc": ["-preset", "p4", "-rc", "vbr", "-cq", "23", "-b:v", "0", "-pix_fmt", "yuv420p"],
+    "h264_qsv": ["-preset", "medium", "-global_quality", "23", "-pix_fmt", "nv12"],
+    "h264_videotoolbox": ["-q:v", "60", "-pix_fmt", "yuv420p"],
+    "libx264": [
+        "-preset", "medium", "-crf", "23", "-pix_fmt", "yuv420p",
+        "-threads", "0", "-x264-params", "threads=auto:sliced-threads=1",
+    ],
+}
 
-def assemble_video(
+
+def _encoder_works(encoder: str) -> bool:
+    """Listed encoders may still lack the hardware — try a tiny test encode."""
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                "-c:v", encoder, *_ENCODER_ARGS[encoder], "-f", "null", "-",
+            ],
+            capture_output=True,
+            timeout=15,
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
+@functools.cache
+def _detect_encoder() -> str:
+    """Pick the first usable H.264 encoder (checked once per process)."""
+    try:
+        listing = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=15,
+        ).stdout
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return "libx264"
+
+    for encoder in _ENCODER_ARGS:
+        if encoder == "libx264":
+            break
+        if f" {encoder} " in listing and _encoder_works(encoder):
+            logger.info(f"Using hardware H.264 encoder: {encoder}")
+            return encoder
+    return "libx264"
+
+
+# ── Background preprocessing ──
+
+# Suffix of backgrounds already scaled/cropped to the output format. Bump the
+# version whenever the preprocessing filter changes so stale files are redone.
+PREPARED_SUFFIX = ".prep.v1.mp4"
+
+
+def prepare_background(source: str, output: str) -> bool:
+    """
+    Re-encode a background video once into VIDEO_WIDTH×VIDEO_HEIGHT@VIDEO_FPS
+    yuv420p, so renders only have to overlay the card instead of rescaling
+    the same clip every time. Returns True on success.
+    """
+    tmp_output = f"{output}.part.mp4"
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats",
+        "-i", source,
+        "-vf",
+        f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,"
+        f"crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},fps={VIDEO_FPS},setsar=1",
+        "-an",
+        "-c:v", "libx264", "-preset", "slow", "-crf", "20", "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart",
+        tmp_output,
+    ]
+    try:
+        result = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=300
+        )
+        if result.returncode != 0:
+            logger.error(
+                f"Background preprocessing failed:\n{result.stderr.decode('utf-8', 'replace')}"
+            )
+            Path(tmp_output).unlink(missing_ok=True)
+            return False
+        Path(tmp_output).replace(output)
+        return True
+    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        logger.error(f"Background preprocessing failed: {e}")
+        Path(tmp_output).unlink(missing_ok=True)
+        return False
+
+
+# Limit concurrent renders so CPU encodes don't oversubscribe the machine
+_ENCODE_SEM = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+
+
+async def _run_ffmpeg(cmd: list[str], timeout: float = 120) -> tuple[int, bytes]:
+    """Run an FFmpeg command without blocking the event loop. Returns (returncode, stderr)."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stderr
+
+
+async def assemble_video(
     card_image_bytes: bytes,
     background_video_path: str,
     music_path: Optional[str] = None,
@@ -47,6 +163,9 @@ def assemble_video(
         card_path = Path(tmp_dir) / "card.png"
         card_path.write_bytes(card_image_bytes)
 
+        # First call probes the available encoders — keep it off the loop too
+        encoder = await asyncio.to_thread(_detect_encoder)
+
         # Build FFmpeg command
         cmd = _build_ffmpeg_command(
             background_video=background_video_path,
@@ -54,20 +173,30 @@ def assemble_video(
             music=music_path,
             output=str(output_path),
             duration=duration,
+            encoder=encoder,
         )
 
         logger.info(f"Running FFmpeg: {' '.join(cmd)}")
 
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
+            async with _ENCODE_SEM:
+                returncode, stderr = await _run_ffmpeg(cmd)
+
+                if returncode != 0 and encoder != "libx264":
+                    # Hardware encoder choked on this input — redo it in software
+                    logger.warning(f"FFmpeg with {encoder} failed, retrying with libx264")
+                    cmd = _build_ffmpeg_command(
+                        background_video=background_video_path,
+                        card_overlay=str(card_path),
+                        music=music_path,
+                        output=str(output_path),
+                        duration=duration,
+                        encoder="libx264",
+                    )
+                    returncode, stderr = await _run_ffmpeg(cmd)
 
-            if result.returncode != 0:
-                logger.error(f"FFmpeg failed:\n{result.stderr}")
+            if returncode != 0:
+                logger.error(f"FFmpeg failed:\n{stderr.decode('utf-8', 'replace')}")
                 return None
 
             if output_path.exists() and output_path.stat().st_size > 0:
@@ -77,7 +206,7 @@ def assemble_video(
                 logger.error("FFmpeg produced no output file")
                 return None
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error("FFmpeg timed out")
             return None
         except FileNotFoundError:
@@ -93,34 +222,41 @@ def _build_ffmpeg_command(
     music: Optional[str],
     output: str,
     duration: int = 5,
+    encoder: str = "libx264",
 ) -> list[str]:
     """Build the FFmpeg command with all filters."""
 
     # Base inputs
     cmd = [
         "ffmpeg",
+        "-hide_banner", "-loglevel", "error", "-nostats",  # Errors only, no per-frame stats
         "-y",  # Overwrite output
         "-stream_loop", "-1",  # Loop background video if shorter than 5s
         "-i", background_video,  # Input 0: background video
-        "-i", card_overlay,  # Input 1: card overlay PNG
+        # Input 1: card overlay PNG, looped as a constant-rate still stream
+        "-loop", "1", "-framerate", str(VIDEO_FPS), "-t", str(duration),
+        "-i", card_overlay,
     ]
 
     # Add music input if available
     if music:
         cmd.extend(["-i", music])  # Input 2: music
 
-    # Video filter: scale+crop background, then overlay card
-    vf = (
-        # Scale background to fill 1080x1920, cropping excess
-        f"[0:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,"
-        f"crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},"
-        f"fps={VIDEO_FPS},"
-        f"setsar=1[bg];"
-        # Scale card overlay to exact video size (it's already sized correctly)
-        f"[1:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}[card];"
-        # Overlay card on background
-        f"[bg][card]overlay=0:0:format=auto[out]"
-    )
+    # Video filter: overlay card on the background. Prepared backgrounds are
+    # already in the output format; anything else gets scaled+cropped here.
+    # The card PNG is always rendered on a VIDEO_WIDTH×VIDEO_HEIGHT canvas.
+    if background_video.endswith(PREPARED_SUFFIX):
+        vf = "[0:v][1:v]overlay=0:0:format=auto:shortest=1[out]"
+    else:
+        vf = (
+            # Scale background to fill 1080x1920, cropping excess
+            f"[0:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,"
+            f"crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},"
+            f"fps={VIDEO_FPS},"
+            f"setsar=1[bg];"
+            # Overlay card on background
+            f"[bg][1:v]overlay=0:0:format=auto:shortest=1[out]"
+        )
 
     cmd.extend(["-filter_complex", vf])
     cmd.extend(["-map", "[out]"])
@@ -137,10 +273,8 @@ def _build_ffmpeg_command(
     # Output settings
     cmd.extend([
         "-t", str(duration),  # Duration in seconds
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "23",
-        "-pix_fmt", "yuv420p",
+        "-c:v", encoder,
+        *_ENCODER_ARGS[encoder],
         "-movflags", "+faststart",  # Web-friendly
     ])
 
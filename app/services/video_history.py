@@ -1,67 +1,90 @@
 """
 Video History — tracks past video facts per channel to avoid duplicate ideas.
-Stored in data/video_history.json.
+Stored in the video_history table of data/history.db (see history_db).
 """
 
 import json
 import logging
 from pathlib import Path
-from typing import Optional
 from datetime import datetime
 
+from app.services import history_db
+
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-HISTORY_FILE = BASE_DIR / "data" / "video_history.json"
-
-
-def _read_history() -> dict:
-    """Read history from disk."""
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
-
-
-def _write_history(data: dict) -> None:
-    """Write history to disk."""
-    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+LEGACY_HISTORY_FILE = BASE_DIR / "data" / "video_history.json"
+
+MAX_PER_CHANNEL = 200
+
+_migrated = False
+
+
+def _migrate_legacy() -> None:
+    """Import data/video_history.json into SQLite once, then retire it."""
+    global _migrated
+    if _migrated:
+        return
+    _migrated = True
+    if not LEGACY_HISTORY_FILE.exists():
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rows = [
+            (channel, e.get("title", ""), e.get("body", ""), e.get("yt_title", ""),
+             e.get("timestamp", ""))
+            for channel, entries in data.items()
+            for e in entries[-MAX_PER_CHANNEL:]
+        ]
+        history_db.insert_many(
+            "INSERT INTO video_history (channel, title, body, yt_title, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        LEGACY_HISTORY_FILE.rename(LEGACY_HISTORY_FILE.with_suffix(".json.migrated"))
+        logger.info(f"Migrated {len(rows)} video history entries to SQLite")
+    except Exception as e:
+        logger.error(f"Failed to migrate video history: {e}")
 
 
 def add_to_history(channel_slug: str, fact) -> None:
     """Add a generated fact to channel history."""
-    data = _read_history()
-    if channel_slug not in data:
-        data[channel_slug] = []
-
-    entry = {
-        "title": fact.title,
-        "body": fact.body,
-        "yt_title": getattr(fact, "yt_title", ""),
-        "timestamp": datetime.now().isoformat(),
-    }
-    data[channel_slug].append(entry)
-
-    # Keep last 200 per channel
-    if len(data[channel_slug]) > 200:
-        data[channel_slug] = data[channel_slug][-200:]
-
-    _write_history(data)
+    _migrate_legacy()
+    history_db.execute_many([
+        (
+            "INSERT INTO video_history (channel, title, body, yt_title, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (channel_slug, fact.title, fact.body, getattr(fact, "yt_title", ""),
+             datetime.now().isoformat()),
+        ),
+        # Keep last 200 per channel
+        (
+            "DELETE FROM video_history WHERE channel = ? AND id NOT IN "
+            "(SELECT id FROM video_history WHERE channel = ? ORDER BY id DESC LIMIT ?)",
+            (channel_slug, channel_slug, MAX_PER_CHANNEL),
+        ),
+    ])
 
 
 def get_history(channel_slug: str, limit: int = 20) -> list[dict]:
-    """Get recent video history for a channel."""
-    data = _read_history()
-    entries = data.get(channel_slug, [])
-    return entries[-limit:]
+    """Get recent video history for a channel (oldest first)."""
+    _migrate_legacy()
+    rows = history_db.query(
+        "SELECT title, body, yt_title, timestamp FROM video_history "
+        "WHERE channel = ? ORDER BY id DESC LIMIT ?",
+        (channel_slug, limit),
+    )
+    return [dict(row) for row in reversed(rows)]
 
 
 def get_past_titles(channel_slug: str, limit: int = 30) -> list[str]:
     """Get past video titles for duplicate avoidance."""
-    entries = get_history(channel_slug, limit)
-    return [e["title"] for e in entries if e.get("title")]
+    _migrate_legacy()
+    # Titles only — no need to pull bodies/descriptions for a dedup list
+    rows = history_db.query(
+        "SELECT title FROM video_history WHERE channel = ? AND title != '' "
+        "ORDER BY id DESC LIMIT ?",
+        (channel_slug, limit),
+    )
+    return [row["title"] for row in reversed(rows)]
@@ -9,15 +9,21 @@ Setup:
 4. Save client_id + client_secret in admin dashboard
 """
 
+import asyncio
 import json
 import logging
+import os
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
 
 from app import settings_store
 
@@ -27,6 +33,12 @@ SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 YOUTUBE_API_SERVICE = "youtube"
 YOUTUBE_API_VERSION = "v3"
 
+# Resumable upload tuning. Chunks must be multiples of 256 KiB; files up to
+# SINGLE_REQUEST_MAX_BYTES are sent in one request (chunksize=-1) instead.
+UPLOAD_CHUNK_ALIGN = 256 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+SINGLE_REQUEST_MAX_BYTES = 100 * 1024 * 1024
+
 
 def _get_oauth_config() -> Optional[dict]:
     """Get YouTube OAuth client credentials from settings."""
@@ -37,6 +49,26 @@ def _get_oauth_config() -> Optional[dict]:
     return None
 
 
+def _get_upload_chunk_size(video_path: str) -> int:
+    """
+    Pick the upload chunk size: -1 (whole file in one request) for
+    typical short videos, otherwise the configured chunk size (api_keys ->
+    youtube_oauth -> chunk_size, default 8 MiB) rounded to 256 KiB.
+    """
+    try:
+        if os.path.getsize(video_path) <= SINGLE_REQUEST_MAX_BYTES:
+            return -1
+    except OSError:
+        pass
+
+    yt = settings_store.get_settings().get("api_keys", {}).get("youtube_oauth", {})
+    try:
+        chunk_size = int(yt.get("chunk_size") or DEFAULT_UPLOAD_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        chunk_size = DEFAULT_UPLOAD_CHUNK_SIZE
+    return max(UPLOAD_CHUNK_ALIGN, chunk_size // UPLOAD_CHUNK_ALIGN * UPLOAD_CHUNK_ALIGN)
+
+
 def _get_channel_tokens(channel_slug: str) -> Optional[dict]:
     """Get stored YouTube OAuth tokens for a channel."""
     ch = settings_store.get_channel(channel_slug)
@@ -50,13 +82,8 @@ def is_channel_connected(channel_slug: str) -> bool:
     return _get_channel_tokens(channel_slug) is not None
 
 
-def get_auth_url(channel_slug: str, redirect_uri: str) -> Optional[str]:
-    """Generate Google OAuth2 consent URL for a channel."""
-    config = _get_oauth_config()
-    if not config:
-        logger.error("YouTube OAuth client credentials not configured")
-        return None
-
+def _build_flow(config: dict, redirect_uri: str) -> Flow:
+    """OAuth2 web flow for the configured client credentials."""
     client_config = {
         "web": {
             "client_id": config["client_id"],
@@ -66,10 +93,19 @@ def get_auth_url(channel_slug: str, redirect_uri: str) -> Optional[str]:
             "redirect_uris": [redirect_uri],
         }
     }
-
     flow = Flow.from_client_config(client_config, scopes=SCOPES)
     flow.redirect_uri = redirect_uri
+    return flow
+
 
+def get_auth_url(channel_slug: str, redirect_uri: str) -> Optional[str]:
+    """Generate Google OAuth2 consent URL for a channel."""
+    config = _get_oauth_config()
+    if not config:
+        logger.error("YouTube OAuth client credentials not configured")
+        return None
+
+    flow = _build_flow(config, redirect_uri)
     auth_url, _ = flow.authorization_url(
         access_type="offline",
         include_granted_scopes="true",
@@ -86,18 +122,7 @@ def handle_callback(auth_code: str, channel_slug: str, redirect_uri: str) -> boo
         return False
 
     try:
-        client_config = {
-            "web": {
-                "client_id": config["client_id"],
-                "client_secret": config["client_secret"],
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "redirect_uris": [redirect_uri],
-            }
-        }
-
-        flow = Flow.from_client_config(client_config, scopes=SCOPES)
-        flow.redirect_uri = redirect_uri
+        flow = _build_flow(config, redirect_uri)
         flow.fetch_token(code=auth_code)
 
         credentials = flow.credentials
@@ -121,21 +146,113 @@ def handle_callback(auth_code: str, channel_slug: str, redirect_uri: str) -> boo
         return False
 
 
+# Credentials per channel, reused across uploads while the access token is
+# still valid, instead of refreshing it for every upload
+_credentials_cache: dict[str, Credentials] = {}
+_credentials_lock = threading.Lock()
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def _get_credentials(channel_slug: str, tokens: dict) -> Credentials:
+    """Get cached credentials for a channel, refreshing the access token when close to expiry."""
+    with _credentials_lock:
+        credentials = _credentials_cache.get(channel_slug)
+        if credentials is None or credentials.refresh_token != tokens["refresh_token"]:
+            credentials = Credentials(
+                token=tokens.get("token"),
+                refresh_token=tokens["refresh_token"],
+                token_uri=tokens.get("token_uri", "https://oauth2.googleapis.com/token"),
+                client_id=tokens.get("client_id"),
+                client_secret=tokens.get("client_secret"),
+            )
+            _credentials_cache[channel_slug] = credentials
+
+        # A stored token without a known expiry is refreshed once up front
+        expiry = credentials.expiry
+        if expiry is None or expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN:
+            credentials.refresh(Request())
+            if credentials.token != tokens.get("token"):
+                settings_store.update_channel(
+                    channel_slug, {"youtube_tokens": {**tokens, "token": credentials.token}}
+                )
+        return credentials
+
+
 def _get_youtube_service(channel_slug: str):
     """Build a YouTube API service for a connected channel."""
     tokens = _get_channel_tokens(channel_slug)
     if not tokens:
         raise ValueError(f"Channel '{channel_slug}' is not connected to YouTube")
 
-    credentials = Credentials(
-        token=tokens.get("token"),
-        refresh_token=tokens["refresh_token"],
-        token_uri=tokens.get("token_uri", "https://oauth2.googleapis.com/token"),
-        client_id=tokens.get("client_id"),
-        client_secret=tokens.get("client_secret"),
+    credentials = _get_credentials(channel_slug, tokens)
+    # Use the discovery document bundled with the client library: no HTTP
+    # fetch (or file-cache lookup) per build. The service object itself is not
+    # shared since httplib2 connections aren't thread-safe.
+    return build(
+        YOUTUBE_API_SERVICE,
+        YOUTUBE_API_VERSION,
+        credentials=credentials,
+        static_discovery=True,
+        cache_discovery=False,
     )
 
-    return build(YOUTUBE_API_SERVICE, YOUTUBE_API_VERSION, credentials=credentials)
+
+def _manifest_path(video_path: str) -> Path:
+    return Path(f"{video_path}.upload.json")
+
+
+def _drive_upload(request, video_path: str) -> dict:
+    """
+    Send a resumable upload request to completion (blocking). Returns the API response.
+
+    For chunked uploads the session URI is kept in <video_path>.upload.json, so
+    an upload interrupted by a crash/restart resumes from the last acked byte.
+    """
+    manifest = _manifest_path(video_path)
+    total_size = os.path.getsize(video_path)
+
+    try:
+        saved = json.loads(manifest.read_text(encoding="utf-8")) if manifest.exists() else None
+    except (OSError, ValueError):
+        saved = None
+    if saved and saved.get("total_size") == total_size and saved.get("session_uri"):
+        logger.info(f"Resuming interrupted YouTube upload for {video_path}")
+        request.resumable_uri = saved["session_uri"]
+        # Makes next_chunk() ask the server how many bytes it already has
+        request._in_error_state = True
+
+    response = None
+    last_logged_pct = -1
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+        except HttpError as e:
+            if not saved or e.resp.status not in (404, 410):
+                raise
+            # Saved session expired — start a fresh one
+            logger.warning("Saved YouTube upload session expired, restarting upload")
+            saved = None
+            request.resumable_uri = None
+            request.resumable_progress = 0
+            request._in_error_state = False
+            continue
+
+        if status:
+            # Log every 5% rather than every chunk
+            pct = int(status.progress() * 100)
+            if pct - last_logged_pct >= 5 or pct == 100:
+                last_logged_pct = pct
+                logger.info(f"Upload progress: {pct}%")
+            tmp = manifest.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "session_uri": request.resumable_uri,
+                "total_size": total_size,
+                "acked_bytes": request.resumable_progress,
+            }), encoding="utf-8")
+            os.replace(tmp, manifest)
+
+    manifest.unlink(missing_ok=True)
+    return response
 
 
 async def upload_to_youtube(
@@ -155,7 +272,8 @@ async def upload_to_youtube(
         return None
 
     try:
-        youtube = _get_youtube_service(channel_slug)
+        # Building the service may fetch the discovery doc / refresh the token
+        youtube = await asyncio.to_thread(_get_youtube_service, channel_slug)
 
         # Clean tags — remove # prefix
         clean_tags = [t.lstrip("#") for t in (tags or [])]
@@ -174,26 +292,28 @@ async def upload_to_youtube(
             },
         }
 
-        # Resumable upload
-        media = MediaFileUpload(
-            video_path,
-            mimetype="video/mp4",
-            resumable=True,
-            chunksize=1024 * 1024,  # 1MB chunks
-        )
-
-        request = youtube.videos().insert(
-            part="snippet,status",
-            body=body,
-            media_body=media,
-        )
-
-        logger.info(f"Uploading video to YouTube: {title}")
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                logger.info(f"Upload progress: {int(status.progress() * 100)}%")
+        # Resumable upload from one buffered handle, closed as soon as we're done
+        chunk_size = _get_upload_chunk_size(video_path)
+        with open(video_path, "rb", buffering=chunk_size if chunk_size > 0 else 1024 * 1024) as fp:
+            if hasattr(os, "posix_fadvise"):
+                # Sequential read hint: lets the kernel read ahead of the uploader
+                os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            media = MediaIoBaseUpload(
+                fp,
+                mimetype="video/mp4",
+                resumable=True,
+                chunksize=chunk_size,
+            )
+
+            request = youtube.videos().insert(
+                part="snippet,status",
+                body=body,
+                media_body=media,
+            )
+
+            logger.info(f"Uploading video to YouTube: {title}")
+            # googleapiclient is sync-only — drive the upload in a worker thread
+            response = await asyncio.to_thread(_drive_upload, request, video_path)
 
         video_id = response.get("id")
         if video_id:
@@ -5,13 +5,19 @@ Stores channels, API keys (with cycling toggles), and preferences in `data/setti
 Provides CRUD operations for channels and API keys.
 """
 
+import copy
 import json
 import logging
 import os
 import re
+import secrets
 import shutil
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, BinaryIO, Callable, Optional, Union
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -54,40 +60,114 @@ DEFAULT_CHANNEL = {
     "youtube_tokens": {},  # OAuth2 tokens for YouTube upload
     "subreddits": [],
     "csv_last_row_index": 0,
+    "csv_resume": {},  # byte offset of csv_last_row_index + file stamp it belongs to
 }
 
 
+# Runs of characters not allowed in a channel slug
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 # ── Core I/O ────────────────────────────────────────────────────────────
 
 
-def _read_settings() -> dict:
-    """Read settings from disk, migrating from legacy files if needed."""
-    if SETTINGS_FILE.exists():
-        try:
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            # Ensure all top-level keys exist
-            for key, val in DEFAULT_SETTINGS.items():
-                if key not in data:
-                    data[key] = val
-            return data
-        except Exception as e:
-            logger.error(f"Failed to read settings: {e}")
+# fsync settings writes before swapping them in (SETTINGS_FSYNC=false skips it in dev)
+SETTINGS_FSYNC = os.getenv("SETTINGS_FSYNC", "true").lower() not in ("0", "false", "no")
 
-    # First run: migrate from legacy .env and channels.json
-    return _migrate_legacy()
+@dataclass(slots=True)
+class _Snapshot:
+    """Parsed settings for one version of the file, plus lookup indexes."""
+    stamp: Optional[tuple[int, int]]  # (mtime_ns, size) of settings.json
+    data: dict
+    channels_by_slug: dict[str, dict] = field(init=False)
+    cron_jobs_by_id: dict[str, dict] = field(init=False)
+    team_by_chat_id: dict[int, dict] = field(init=False)
+
+    def __post_init__(self):
+        self.channels_by_slug = _index(self.data.get("channels", []), "slug")
+        self.cron_jobs_by_id = _index(self.data.get("cron_jobs", []), "id")
+        self.team_by_chat_id = _index(self.data.get("team_members", []), "chat_id")
+
+
+def _index(entries: list, key: str) -> dict:
+    """Map entry[key] -> entry, skipping entries without the key (e.g. from a hand-edited import)."""
+    # reversed() so the first entry wins on duplicates, like the old linear scans
+    return {
+        e[key]: e for e in reversed(entries)
+        if isinstance(e, dict) and e.get(key) is not None
+    }
+
+
+# Parsed settings for the current file version. Callers of _read_settings get
+# their own deep copy since they mutate the dict before writing it back.
+_cache: Optional[_Snapshot] = None
+_cache_lock = threading.RLock()
+
+
+def _load_snapshot() -> Optional[_Snapshot]:
+    """
+    Return the cached snapshot, reloading if settings.json changed. None if
+    there is no settings.json yet; raises if the file exists but can't be
+    parsed, so callers never mistake it for a first run and overwrite it.
+    """
+    global _cache
+    try:
+        st = SETTINGS_FILE.stat()
+    except FileNotFoundError:
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _cache is not None and _cache.stamp == stamp:
+        return _cache
+    try:
+        data = orjson.loads(SETTINGS_FILE.read_bytes())
+        # Ensure all top-level keys exist
+        for key, val in DEFAULT_SETTINGS.items():
+            if key not in data:
+                data[key] = copy.deepcopy(val)
+        _cache = _Snapshot(stamp, data)
+        return _cache
+    except Exception as e:
+        logger.error(f"Failed to read settings: {e}")
+        raise RuntimeError(f"{SETTINGS_FILE} exists but could not be read: {e}") from e
+
+
+def _snapshot() -> _Snapshot:
+    """Current settings snapshot (read-only!), migrating from legacy files if needed."""
+    with _cache_lock:
+        snap = _load_snapshot()
+        if snap is None:
+            # First run: migrate from legacy .env and channels.json
+            data = _migrate_legacy()
+            snap = _load_snapshot() or _Snapshot(None, data)
+        return snap
+
+
+def _read_settings() -> dict:
+    """Read settings (a private copy the caller may modify)."""
+    return copy.deepcopy(_snapshot().data)
 
 
 def _write_settings(data: dict) -> None:
     """Write settings to disk."""
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    global _cache
+    with _cache_lock:
+        _cache = None
+        # Write to a temp file and swap it in, so a crash mid-write can't
+        # truncate settings.json (and lose every channel's OAuth tokens)
+        tmp = DATA_DIR / f".settings.json.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            if SETTINGS_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, SETTINGS_FILE)
 
 
 def _migrate_legacy() -> dict:
     """Migrate from legacy .env / channels.json to settings.json."""
     logger.info("Migrating legacy configuration to settings.json...")
-    data = json.loads(json.dumps(DEFAULT_SETTINGS))
+    data = copy.deepcopy(DEFAULT_SETTINGS)
 
     # Migrate .env API keys
     gemini_keys_raw = os.getenv("GEMINI_API_KEY", "")
@@ -124,6 +204,20 @@ def _migrate_legacy() -> dict:
     return data
 
 
+def mutate_settings(fn: Callable[[dict], Any]) -> Any:
+    """
+    Read settings, let fn modify them in place, and write them back — all under
+    the settings lock, so concurrent updates can't overwrite each other.
+    fn may return False to skip the write; its return value is passed through.
+    """
+    with _cache_lock:
+        data = _read_settings()
+        result = fn(data)
+        if result is not False:
+            _write_settings(data)
+        return result
+
+
 # ── Public API ──────────────────────────────────────────────────────────
 
 
@@ -147,60 +241,66 @@ def list_channels() -> list[dict]:
 
 def get_channel(slug: str) -> Optional[dict]:
     """Get a channel by slug."""
-    for ch in list_channels():
-        if ch["slug"] == slug:
-            return ch
-    return None
+    ch = _snapshot().channels_by_slug.get(slug)
+    return copy.deepcopy(ch) if ch is not None else None
 
 
 def add_channel(channel_data: dict) -> dict:
     """Add a new channel. Returns the created channel dict."""
-    data = _read_settings()
-
     # Merge with defaults
     ch = {**DEFAULT_CHANNEL, **channel_data}
 
     # Generate slug from name if not provided
     if not ch["slug"]:
-        ch["slug"] = re.sub(r"[^a-z0-9]+", "_", ch["name"].lower()).strip("_")
-
-    # Check for duplicate slug
-    existing_slugs = {c["slug"] for c in data["channels"]}
-    if ch["slug"] in existing_slugs:
-        counter = 2
-        while f"{ch['slug']}_{counter}" in existing_slugs:
-            counter += 1
-        ch["slug"] = f"{ch['slug']}_{counter}"
+        ch["slug"] = _SLUG_RE.sub("_", ch["name"].lower()).strip("_")
+
+    def apply(data: dict) -> None:
+        # On a duplicate slug, take the next free "<slug>_<n>" in one pass
+        # over existing slugs instead of probing counters one by one
+        base = ch["slug"]
+        existing_slugs = {
+            s for c in data["channels"] if isinstance(s := c.get("slug"), str)
+        }
+        if base in existing_slugs:
+            suffix_re = re.compile(re.escape(base) + r"_(\d+)")
+            taken = [
+                int(m.group(1)) for slug in existing_slugs
+                if (m := suffix_re.fullmatch(slug))
+            ]
+            ch["slug"] = f"{base}_{max(taken, default=1) + 1}"
+        data["channels"].append(ch)
+
+    mutate_settings(apply)
 
     # Create channel assets directory
     ch_dir = CHANNELS_DIR / ch["slug"]
     ch_dir.mkdir(parents=True, exist_ok=True)
-
-    data["channels"].append(ch)
-    _write_settings(data)
     return ch
 
 
 def update_channel(slug: str, updates: dict) -> Optional[dict]:
     """Update a channel's settings. Returns updated channel or None."""
-    data = _read_settings()
-    for i, ch in enumerate(data["channels"]):
-        if ch["slug"] == slug:
-            # Don't allow slug change
-            updates.pop("slug", None)
-            data["channels"][i] = {**ch, **updates}
-            _write_settings(data)
-            return data["channels"][i]
-    return None
+    # Don't allow slug change
+    updates.pop("slug", None)
+
+    def apply(data: dict):
+        for i, ch in enumerate(data["channels"]):
+            if ch.get("slug") == slug:
+                data["channels"][i] = {**ch, **updates}
+                return data["channels"][i]
+        return False
+
+    return mutate_settings(apply) or None
 
 
 def delete_channel(slug: str) -> bool:
     """Delete a channel and its assets. Returns True if deleted."""
-    data = _read_settings()
-    original_len = len(data["channels"])
-    data["channels"] = [ch for ch in data["channels"] if ch["slug"] != slug]
-    if len(data["channels"]) < original_len:
-        _write_settings(data)
+    def apply(data: dict) -> bool:
+        original_len = len(data["channels"])
+        data["channels"] = [ch for ch in data["channels"] if ch.get("slug") != slug]
+        return len(data["channels"]) < original_len
+
+    if mutate_settings(apply):
         # Optionally remove assets dir
         ch_dir = CHANNELS_DIR / slug
         if ch_dir.exists():
@@ -209,40 +309,41 @@ def delete_channel(slug: str) -> bool:
     return False
 
 
-def save_channel_template(slug: str, image_bytes: bytes) -> str:
-    """Save a template image for a channel. Returns the file path."""
+def _save_channel_file(slug: str, filename: str, content: Union[bytes, BinaryIO]) -> str:
+    """
+    Write a channel asset from bytes or a binary file object (e.g. an upload's
+    spooled temp file, copied in chunks without loading it all into memory).
+    Returns the file path.
+    """
     ch_dir = CHANNELS_DIR / slug
     ch_dir.mkdir(parents=True, exist_ok=True)
-    template_path = ch_dir / "template.png"
-    template_path.write_bytes(image_bytes)
-    return str(template_path)
+    path = ch_dir / filename
+    if isinstance(content, (bytes, bytearray)):
+        path.write_bytes(content)
+    else:
+        with open(path, "wb") as f:
+            shutil.copyfileobj(content, f, 1024 * 1024)
+    return str(path)
+
+
+def save_channel_template(slug: str, image: Union[bytes, BinaryIO]) -> str:
+    """Save a template image for a channel. Returns the file path."""
+    return _save_channel_file(slug, "template.png", image)
 
 
-def save_channel_svg_template(slug: str, svg_bytes: bytes) -> str:
+def save_channel_svg_template(slug: str, svg: Union[bytes, BinaryIO]) -> str:
     """Save an SVG template for a channel. Returns the file path."""
-    ch_dir = CHANNELS_DIR / slug
-    ch_dir.mkdir(parents=True, exist_ok=True)
-    svg_path = ch_dir / "template.svg"
-    svg_path.write_bytes(svg_bytes)
-    return str(svg_path)
+    return _save_channel_file(slug, "template.svg", svg)
 
 
-def save_channel_logo(slug: str, image_bytes: bytes) -> str:
+def save_channel_logo(slug: str, image: Union[bytes, BinaryIO]) -> str:
     """Save a logo image for a channel. Returns the file path."""
-    ch_dir = CHANNELS_DIR / slug
-    ch_dir.mkdir(parents=True, exist_ok=True)
-    logo_path = ch_dir / "logo.png"
-    logo_path.write_bytes(image_bytes)
-    return str(logo_path)
+    return _save_channel_file(slug, "logo.png", image)
 
 
-def save_channel_csv_ideas(slug: str, csv_bytes: bytes) -> str:
+def save_channel_csv_ideas(slug: str, csv_file: Union[bytes, BinaryIO]) -> str:
     """Save an uploaded CSV file containing ideas for a channel."""
-    ch_dir = CHANNELS_DIR / slug
-    ch_dir.mkdir(parents=True, exist_ok=True)
-    csv_path = ch_dir / "ideas.csv"
-    csv_path.write_bytes(csv_bytes)
-    return str(csv_path)
+    return _save_channel_file(slug, "ideas.csv", csv_file)
 
 
 # ── API Key Management ──────────────────────────────────────────────────
@@ -259,51 +360,61 @@ def get_api_keys(service: str) -> dict:
 
 def add_api_key(service: str, key: str) -> list[str]:
     """Add an API key for a service. Returns updated key list."""
-    data = _read_settings()
-    if service in ("google_cse_cx", "telegram_bot_token"):
-        data["api_keys"][service] = key
-        _write_settings(data)
-        return [key]
-    if service not in data["api_keys"]:
-        data["api_keys"][service] = {"keys": [], "cycling": False}
-    if key not in data["api_keys"][service]["keys"]:
-        data["api_keys"][service]["keys"].append(key)
-    _write_settings(data)
-    return data["api_keys"][service]["keys"]
+    def apply(data: dict) -> list[str]:
+        if service in ("google_cse_cx", "telegram_bot_token"):
+            data["api_keys"][service] = key
+            return [key]
+        if service not in data["api_keys"]:
+            data["api_keys"][service] = {"keys": [], "cycling": False}
+        if key not in data["api_keys"][service]["keys"]:
+            data["api_keys"][service]["keys"].append(key)
+        return data["api_keys"][service]["keys"]
+
+    return mutate_settings(apply)
 
 
 def remove_api_key(service: str, key_index: int) -> list[str]:
     """Remove an API key by index. Returns updated key list."""
-    data = _read_settings()
-    if service in data["api_keys"] and service != "google_cse_cx":
-        keys = data["api_keys"][service]["keys"]
-        if 0 <= key_index < len(keys):
-            keys.pop(key_index)
-            _write_settings(data)
-        return keys
-    return []
+    removed: list[str] = []
+
+    def apply(data: dict):
+        nonlocal removed
+        if service in data["api_keys"] and service != "google_cse_cx":
+            removed = data["api_keys"][service]["keys"]
+            if 0 <= key_index < len(removed):
+                removed.pop(key_index)
+                return None
+        return False
+
+    mutate_settings(apply)
+    return removed
 
 
 def set_cycling(service: str, enabled: bool) -> None:
     """Enable or disable key cycling for a service."""
-    data = _read_settings()
-    if service in data["api_keys"] and service != "google_cse_cx":
-        data["api_keys"][service]["cycling"] = enabled
-        _write_settings(data)
+    def apply(data: dict):
+        if service in data["api_keys"] and service != "google_cse_cx":
+            data["api_keys"][service]["cycling"] = enabled
+            return None
+        return False
+
+    mutate_settings(apply)
 
 
 # ── Music Files ─────────────────────────────────────────────────────────
 
 SUPPORTED_AUDIO = {".mp3", ".wav", ".ogg", ".m4a", ".aac"}
+_AUDIO_SUFFIXES = tuple(SUPPORTED_AUDIO)
 
 
 def list_music_files() -> list[str]:
     """List available music files in assets/music/."""
-    return [
-        f.name
-        for f in MUSIC_DIR.iterdir()
-        if f.is_file() and f.suffix.lower() in SUPPORTED_AUDIO
-    ]
+    with os.scandir(MUSIC_DIR) as entries:
+        return [
+            entry.name
+            for entry in entries
+            if entry.name.lower().endswith(_AUDIO_SUFFIXES) and entry.is_file()
+        ]
 
 
 # ── Cron Jobs ──────────────────────────────────────────────────────────
@@ -316,21 +427,14 @@ def list_cron_jobs() -> list[dict]:
 
 def get_cron_job(job_id: str) -> Optional[dict]:
     """Get a cron job by ID."""
-    for job in list_cron_jobs():
-        if job["id"] == job_id:
-            return job
-    return None
+    job = _snapshot().cron_jobs_by_id.get(job_id)
+    return copy.deepcopy(job) if job is not None else None
 
 
 def add_cron_job(job_data: dict) -> dict:
     """Add a new cron job. Returns the created job dict."""
-    import uuid
-    data = _read_settings()
-    if "cron_jobs" not in data:
-        data["cron_jobs"] = []
-
     job = {
-        "id": str(uuid.uuid4())[:8],
+        "id": secrets.token_hex(4),
         "channel_slug": job_data.get("channel_slug", ""),
         "num_ideas": int(job_data.get("num_ideas", 10)),
         "schedule_time": job_data.get("schedule_time", "09:00"),
@@ -340,32 +444,32 @@ def add_cron_job(job_data: dict) -> dict:
         "idea_source": job_data.get("idea_source", "ai"),
         "subreddits": job_data.get("subreddits", []),
     }
-    data["cron_jobs"].append(job)
-    _write_settings(data)
+    mutate_settings(lambda data: data.setdefault("cron_jobs", []).append(job))
     return job
 
 
 def update_cron_job(job_id: str, updates: dict) -> Optional[dict]:
     """Update a cron job's settings."""
-    data = _read_settings()
-    for i, job in enumerate(data.get("cron_jobs", [])):
-        if job["id"] == job_id:
-            updates.pop("id", None)
-            data["cron_jobs"][i] = {**job, **updates}
-            _write_settings(data)
-            return data["cron_jobs"][i]
-    return None
+    updates.pop("id", None)
+
+    def apply(data: dict):
+        for i, job in enumerate(data.get("cron_jobs", [])):
+            if job.get("id") == job_id:
+                data["cron_jobs"][i] = {**job, **updates}
+                return data["cron_jobs"][i]
+        return False
+
+    return mutate_settings(apply) or None
 
 
 def delete_cron_job(job_id: str) -> bool:
     """Delete a cron job."""
-    data = _read_settings()
-    original = len(data.get("cron_jobs", []))
-    data["cron_jobs"] = [j for j in data.get("cron_jobs", []) if j["id"] != job_id]
-    if len(data["cron_jobs"]) < original:
-        _write_settings(data)
-        return True
-    return False
+    def apply(data: dict) -> bool:
+        original = len(data.get("cron_jobs", []))
+        data["cron_jobs"] = [j for j in data.get("cron_jobs", []) if j.get("id") != job_id]
+        return len(data["cron_jobs"]) < original
+
+    return mutate_settings(apply)
 
 
 # ── Team Members ──────────────────────────────────────────────────────
@@ -378,31 +482,24 @@ def list_team_members() -> list[dict]:
 
 def add_team_member(name: str, chat_id: int) -> dict:
     """Add a team member."""
-    data = _read_settings()
-    if "team_members" not in data:
-        data["team_members"] = []
     member = {"name": name, "chat_id": chat_id}
-    data["team_members"].append(member)
-    _write_settings(data)
+    mutate_settings(lambda data: data.setdefault("team_members", []).append(member))
     return member
 
 
 def delete_team_member(chat_id: int) -> bool:
     """Remove a team member by chat_id."""
-    data = _read_settings()
-    original = len(data.get("team_members", []))
-    data["team_members"] = [
-        m for m in data.get("team_members", []) if m["chat_id"] != chat_id
-    ]
-    if len(data["team_members"]) < original:
-        _write_settings(data)
-        return True
-    return False
+    def apply(data: dict) -> bool:
+        original = len(data.get("team_members", []))
+        data["team_members"] = [
+            m for m in data.get("team_members", []) if m.get("chat_id") != chat_id
+        ]
+        return len(data["team_members"]) < original
+
+    return mutate_settings(apply)
 
 
 def get_team_member_name(chat_id: int) -> str:
     """Get a team member's name by chat_id."""
-    for m in list_team_members():
-        if m["chat_id"] == chat_id:
-            return m["name"]
-    return str(chat_id)
+    member = _snapshot().team_by_chat_id.get(chat_id)
+    return member["name"] if member is not None else str(chat_id)
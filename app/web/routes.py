@@ -2,28 +2,103 @@
 Web API Routes — FastAPI endpoints for the web interface and admin panel.
 """
 
+import asyncio
 import logging
+import os
 from pathlib import Path
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, UploadFile, File, Form, Request
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import (
+    FileResponse, HTMLResponse, ORJSONResponse, RedirectResponse, StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
+from jinja2 import Environment, FileSystemLoader
 
 from app.config import load_channels
+from app.log_handler import get_log_handler
 from app.pipeline import generate_video
 from app import settings_store
+from app.scheduler import _run_cron_job, reload_jobs
 from app.services.api_key_manager import get_key_manager, reload_key_manager
+from app.services.youtube_uploader import get_auth_url, handle_callback, is_channel_connected
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-templates = Jinja2Templates(
-    directory=str(Path(__file__).parent / "templates")
+
+# Templates are compiled once (see precompile_templates). Set
+# TEMPLATES_AUTO_RELOAD=true while editing them to skip the restart.
+templates = Environment(
+    loader=FileSystemLoader(str(Path(__file__).parent / "templates")),
+    autoescape=True,
+    auto_reload=os.getenv("TEMPLATES_AUTO_RELOAD", "").lower() in ("1", "true", "yes"),
 )
 
 
+def precompile_templates() -> None:
+    """Compile every page template up front so the first request doesn't pay for it."""
+    for name in templates.list_templates(extensions=["html"]):
+        templates.get_template(name)
+
+
+async def _read_json(request: Request):
+    """Parse a JSON request body with orjson."""
+    return orjson.loads(await request.body())
+
+
+# Images accepted by /generate (the formats the card builders can embed)
+GENERATE_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+MAX_GENERATE_IMAGE_BYTES = 20 * 1024 * 1024
+
+
+async def _read_upload(file: UploadFile, limit: int) -> Optional[bytes]:
+    """Read an upload in chunks, giving up (None) as soon as it exceeds limit bytes."""
+    chunks = []
+    size = 0
+    while chunk := await file.read(1024 * 1024):
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+# Handlers run on the event loop, so settings writes (read-modify-write of
+# settings.json, plus fsync) go through asyncio.to_thread. The writes
+# themselves are serialized by settings_store.mutate_settings; the follow-up
+# reloads are debounced so a burst of admin edits reloads once.
+
+_RELOAD_DELAY_SECONDS = 0.5
+_pending_reloads: set[str] = set()
+_reload_handle: Optional[asyncio.TimerHandle] = None
+
+
+def _schedule_reload(*targets: str) -> None:
+    """
+    Queue a reload of "keys" (API key manager) and/or "jobs" (scheduler).
+    Saves arriving within _RELOAD_DELAY_SECONDS of the first share one reload.
+    """
+    global _reload_handle
+    _pending_reloads.update(targets)
+    if _reload_handle is None:
+        _reload_handle = asyncio.get_running_loop().call_later(
+            _RELOAD_DELAY_SECONDS, _flush_reloads,
+        )
+
+
+def _flush_reloads() -> None:
+    global _reload_handle
+    _reload_handle = None
+    targets = set(_pending_reloads)
+    _pending_reloads.clear()
+    if "keys" in targets:
+        reload_key_manager()
+    if "jobs" in targets:
+        reload_jobs()
+
+
 # ── Main Pages ─────────────────────────────────────────────────────────
 
 
@@ -31,16 +106,15 @@ templates = Jinja2Templates(
 async def index(request: Request):
     """Serve the upload page."""
     channels = load_channels()
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "channels": channels},
+    return HTMLResponse(
+        templates.get_template("index.html").render(request=request, channels=channels)
     )
 
 
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_page(request: Request):
     """Serve the admin dashboard."""
-    return templates.TemplateResponse("admin.html", {"request": request})
+    return HTMLResponse(templates.get_template("admin.html").render(request=request))
 
 
 # ── Video Generation ───────────────────────────────────────────────────
@@ -53,16 +127,32 @@ async def generate(
     image: UploadFile = File(None),
 ):
     """Generate a video from the provided input."""
-    image_bytes = None
-    if image and image.filename:
-        image_bytes = await image.read()
-
-    if not text and not image_bytes:
-        return JSONResponse(
+    has_image = bool(image and image.filename)
+    if not text and not has_image:
+        return ORJSONResponse(
             status_code=400,
             content={"error": "Please provide text, a URL, or an image."},
         )
 
+    image_bytes = None
+    if has_image:
+        if image.content_type not in GENERATE_IMAGE_TYPES:
+            return ORJSONResponse(
+                status_code=415,
+                content={"error": "Image must be a JPEG, PNG or WebP file."},
+            )
+        image_bytes = await _read_upload(image, MAX_GENERATE_IMAGE_BYTES)
+        if image_bytes is None:
+            return ORJSONResponse(
+                status_code=413,
+                content={"error": f"Image is larger than {MAX_GENERATE_IMAGE_BYTES // (1024 * 1024)} MB."},
+            )
+        if not image_bytes and not text:
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": "Please provide text, a URL, or an image."},
+            )
+
     result = await generate_video(
         channel_slug=channel,
         text=text,
@@ -72,7 +162,7 @@ async def generate(
     if result and Path(result.video_path).exists():
         # Return JSON with video download URL and YT metadata
         video_filename = Path(result.video_path).name
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "video_url": f"/output/{video_filename}",
             "yt_title": result.yt_title,
@@ -82,7 +172,7 @@ async def generate(
             "fact_body": result.fact_body,
         })
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": "Video generation failed. Check server logs."},
         )
@@ -95,52 +185,55 @@ async def generate(
 async def api_list_channels():
     """List all channels."""
     channels = settings_store.list_channels()
-    # Add template status
+    # Add template status (one directory listing per channel instead of a stat per asset)
     for ch in channels:
         slug = ch.get("slug", "")
-        ch_dir = settings_store.CHANNELS_DIR / slug
-        ch["has_template"] = (ch_dir / "template.png").exists()
-        ch["has_svg_template"] = (ch_dir / "template.svg").exists()
-        ch["has_logo"] = (ch_dir / "logo.png").exists()
-        ch["has_csv_ideas"] = (ch_dir / "ideas.csv").exists()
+        try:
+            files = set(os.listdir(settings_store.CHANNELS_DIR / slug))
+        except OSError:
+            files = set()
+        ch["has_template"] = "template.png" in files
+        ch["has_svg_template"] = "template.svg" in files
+        ch["has_logo"] = "logo.png" in files
+        ch["has_csv_ideas"] = "ideas.csv" in files
     return channels
 
 
 @router.post("/api/channels")
 async def api_create_channel(request: Request):
     """Create a new channel."""
-    data = await request.json()
+    data = await _read_json(request)
     if not data.get("name"):
-        return JSONResponse(status_code=400, content={"error": "Channel name is required"})
-    channel = settings_store.add_channel(data)
+        return ORJSONResponse(status_code=400, content={"error": "Channel name is required"})
+    channel = await asyncio.to_thread(settings_store.add_channel, data)
     return channel
 
 
 @router.put("/api/channels/{slug}")
 async def api_update_channel(slug: str, request: Request):
     """Update a channel's settings."""
-    data = await request.json()
-    updated = settings_store.update_channel(slug, data)
+    data = await _read_json(request)
+    updated = await asyncio.to_thread(settings_store.update_channel, slug, data)
     if updated:
         return updated
-    return JSONResponse(status_code=404, content={"error": "Channel not found"})
+    return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
 
 
 @router.delete("/api/channels/{slug}")
 async def api_delete_channel(slug: str):
     """Delete a channel."""
-    if settings_store.delete_channel(slug):
+    if await asyncio.to_thread(settings_store.delete_channel, slug):
         return {"ok": True}
-    return JSONResponse(status_code=404, content={"error": "Channel not found"})
+    return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
 
 
 @router.post("/api/channels/{slug}/template")
 async def api_upload_template(slug: str, file: UploadFile = File(...)):
     """Upload a card template for a channel."""
     if not settings_store.get_channel(slug):
-        return JSONResponse(status_code=404, content={"error": "Channel not found"})
-    image_bytes = await file.read()
-    path = settings_store.save_channel_template(slug, image_bytes)
+        return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
+    # Copy the spooled upload straight to disk (off the event loop)
+    path = await asyncio.to_thread(settings_store.save_channel_template, slug, file.file)
     return {"ok": True, "path": path}
 
 
@@ -148,9 +241,8 @@ async def api_upload_template(slug: str, file: UploadFile = File(...)):
 async def api_upload_svg_template(slug: str, file: UploadFile = File(...)):
     """Upload an SVG card template for a channel."""
     if not settings_store.get_channel(slug):
-        return JSONResponse(status_code=404, content={"error": "Channel not found"})
-    svg_bytes = await file.read()
-    path = settings_store.save_channel_svg_template(slug, svg_bytes)
+        return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
+    path = await asyncio.to_thread(settings_store.save_channel_svg_template, slug, file.file)
     return {"ok": True, "path": path}
 
 
@@ -158,9 +250,8 @@ async def api_upload_svg_template(slug: str, file: UploadFile = File(...)):
 async def api_upload_logo(slug: str, file: UploadFile = File(...)):
     """Upload a logo for a channel."""
     if not settings_store.get_channel(slug):
-        return JSONResponse(status_code=404, content={"error": "Channel not found"})
-    image_bytes = await file.read()
-    path = settings_store.save_channel_logo(slug, image_bytes)
+        return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
+    path = await asyncio.to_thread(settings_store.save_channel_logo, slug, file.file)
     return {"ok": True, "path": path}
 
 
@@ -168,9 +259,8 @@ async def api_upload_logo(slug: str, file: UploadFile = File(...)):
 async def api_upload_csv_ideas(slug: str, file: UploadFile = File(...)):
     """Upload a custom ideas CSV for a channel."""
     if not settings_store.get_channel(slug):
-        return JSONResponse(status_code=404, content={"error": "Channel not found"})
-    csv_bytes = await file.read()
-    path = settings_store.save_channel_csv_ideas(slug, csv_bytes)
+        return ORJSONResponse(status_code=404, content={"error": "Channel not found"})
+    path = await asyncio.to_thread(settings_store.save_channel_csv_ideas, slug, file.file)
     return {"ok": True, "path": path}
 
 
@@ -199,31 +289,31 @@ async def api_get_all_keys():
 @router.post("/api/keys/{service}")
 async def api_add_key(service: str, request: Request):
     """Add an API key for a service."""
-    data = await request.json()
+    data = await _read_json(request)
     key = data.get("key", "").strip()
     if not key:
-        return JSONResponse(status_code=400, content={"error": "Key is required"})
+        return ORJSONResponse(status_code=400, content={"error": "Key is required"})
 
-    settings_store.add_api_key(service, key)
-    reload_key_manager()
+    await asyncio.to_thread(settings_store.add_api_key, service, key)
+    _schedule_reload("keys")
     return {"ok": True}
 
 
 @router.delete("/api/keys/{service}/{index}")
 async def api_delete_key(service: str, index: int):
     """Remove an API key by index."""
-    settings_store.remove_api_key(service, index)
-    reload_key_manager()
+    await asyncio.to_thread(settings_store.remove_api_key, service, index)
+    _schedule_reload("keys")
     return {"ok": True}
 
 
 @router.put("/api/keys/{service}/cycling")
 async def api_set_cycling(service: str, request: Request):
     """Toggle key cycling for a service."""
-    data = await request.json()
+    data = await _read_json(request)
     enabled = data.get("enabled", False)
-    settings_store.set_cycling(service, enabled)
-    reload_key_manager()
+    await asyncio.to_thread(settings_store.set_cycling, service, enabled)
+    _schedule_reload("keys")
     return {"ok": True, "cycling": enabled}
 
 
@@ -256,7 +346,7 @@ async def api_get_settings():
 async def api_export_settings():
     """Export the full settings.json file."""
     if not settings_store.SETTINGS_FILE.exists():
-        return JSONResponse(status_code=404, content={"error": "Settings file not found"})
+        return ORJSONResponse(status_code=404, content={"error": "Settings file not found"})
     return FileResponse(
         settings_store.SETTINGS_FILE,
         media_type="application/json",
@@ -267,23 +357,20 @@ async def api_export_settings():
 @router.post("/api/settings/import")
 async def api_import_settings(file: UploadFile = File(...)):
     """Import a settings.json file."""
-    import json
     try:
         content = await file.read()
-        data = json.loads(content)
-        settings_store.save_settings(data)
+        data = orjson.loads(content)
+        await asyncio.to_thread(settings_store.save_settings, data)
         
         # Reload key manager and scheduler to pick up changes
-        reload_key_manager()
-        from app.scheduler import reload_jobs
-        reload_jobs()
+        _schedule_reload("keys", "jobs")
         
         return {"ok": True, "message": "Settings imported successfully."}
-    except json.JSONDecodeError:
-        return JSONResponse(status_code=400, content={"error": "Invalid JSON file"})
+    except orjson.JSONDecodeError:
+        return ORJSONResponse(status_code=400, content={"error": "Invalid JSON file"})
     except Exception as e:
         logger.error(f"Failed to import settings: {e}")
-        return JSONResponse(status_code=500, content={"error": f"Failed to import: {str(e)}"})
+        return ORJSONResponse(status_code=500, content={"error": f"Failed to import: {str(e)}"})
 
 
 # ── Cron Jobs ──────────────────────────────────────────────────────────
@@ -298,36 +385,33 @@ async def api_list_cron_jobs():
 @router.post("/api/cron")
 async def api_create_cron_job(request: Request):
     """Create a new cron job."""
-    data = await request.json()
+    data = await _read_json(request)
     if not data.get("channel_slug"):
-        return JSONResponse(status_code=400, content={"error": "Channel is required"})
-    job = settings_store.add_cron_job(data)
+        return ORJSONResponse(status_code=400, content={"error": "Channel is required"})
+    job = await asyncio.to_thread(settings_store.add_cron_job, data)
     # Reload scheduler
-    from app.scheduler import reload_jobs
-    reload_jobs()
+    _schedule_reload("jobs")
     return job
 
 
 @router.put("/api/cron/{job_id}")
 async def api_update_cron_job(job_id: str, request: Request):
     """Update a cron job."""
-    data = await request.json()
-    updated = settings_store.update_cron_job(job_id, data)
+    data = await _read_json(request)
+    updated = await asyncio.to_thread(settings_store.update_cron_job, job_id, data)
     if updated:
-        from app.scheduler import reload_jobs
-        reload_jobs()
+        _schedule_reload("jobs")
         return updated
-    return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return ORJSONResponse(status_code=404, content={"error": "Job not found"})
 
 
 @router.delete("/api/cron/{job_id}")
 async def api_delete_cron_job(job_id: str):
     """Delete a cron job."""
-    if settings_store.delete_cron_job(job_id):
-        from app.scheduler import reload_jobs
-        reload_jobs()
+    if await asyncio.to_thread(settings_store.delete_cron_job, job_id):
+        _schedule_reload("jobs")
         return {"ok": True}
-    return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return ORJSONResponse(status_code=404, content={"error": "Job not found"})
 
 
 @router.post("/api/cron/{job_id}/trigger")
@@ -335,10 +419,8 @@ async def api_trigger_cron_job(job_id: str):
     """Manually trigger a cron job for testing."""
     job = settings_store.get_cron_job(job_id)
     if not job:
-        return JSONResponse(status_code=404, content={"error": "Job not found"})
+        return ORJSONResponse(status_code=404, content={"error": "Job not found"})
 
-    from app.scheduler import _run_cron_job
-    import asyncio
     asyncio.create_task(_run_cron_job(job))
     return {"ok": True, "message": "Job triggered — check Telegram for ideas"}
 
@@ -355,21 +437,21 @@ async def api_list_team():
 @router.post("/api/team")
 async def api_add_team_member(request: Request):
     """Add a team member."""
-    data = await request.json()
+    data = await _read_json(request)
     name = data.get("name", "").strip()
     chat_id = data.get("chat_id")
     if not name or not chat_id:
-        return JSONResponse(status_code=400, content={"error": "Name and chat ID are required"})
-    member = settings_store.add_team_member(name, int(chat_id))
+        return ORJSONResponse(status_code=400, content={"error": "Name and chat ID are required"})
+    member = await asyncio.to_thread(settings_store.add_team_member, name, int(chat_id))
     return member
 
 
 @router.delete("/api/team/{chat_id}")
 async def api_delete_team_member(chat_id: int):
     """Remove a team member."""
-    if settings_store.delete_team_member(chat_id):
+    if await asyncio.to_thread(settings_store.delete_team_member, chat_id):
         return {"ok": True}
-    return JSONResponse(status_code=404, content={"error": "Member not found"})
+    return ORJSONResponse(status_code=404, content={"error": "Member not found"})
 
 
 # ── Logs ───────────────────────────────────────────────────────────────
@@ -378,7 +460,6 @@ async def api_delete_team_member(chat_id: int):
 @router.get("/api/logs")
 async def api_get_logs(after: int = 0, limit: int = 200):
     """Get recent log entries for the admin dashboard."""
-    from app.log_handler import get_log_handler
     handler = get_log_handler()
     if after > 0:
         logs, counter = handler.get_logs(after=after, limit=limit)
@@ -387,24 +468,62 @@ async def api_get_logs(after: int = 0, limit: int = 200):
     return {"logs": logs, "counter": counter}
 
 
+LOG_STREAM_KEEPALIVE = 15  # seconds between comments on an idle stream, for proxies
+
+
+async def _log_event_iter(request: Request, after: int, limit: int):
+    """Yield SSE messages with new log entries as they are recorded."""
+    handler = get_log_handler()
+    event = asyncio.Event()
+    handler.add_listener(event)
+    try:
+        while not await request.is_disconnected():
+            # Clear before reading so a record logged in between still wakes us
+            event.clear()
+            if after > 0:
+                logs, after = handler.get_logs(after=after, limit=limit)
+            else:
+                logs, after = handler.get_all(limit=limit)
+            if logs:
+                yield b"data: " + orjson.dumps({"logs": logs, "counter": after}) + b"\n\n"
+            try:
+                await asyncio.wait_for(event.wait(), timeout=LOG_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+    finally:
+        handler.remove_listener(event)
+
+
+@router.get("/api/logs/stream")
+async def api_stream_logs(request: Request, after: int = 0, limit: int = 200):
+    """Server-Sent Events stream of log entries (/api/logs stays as the polling fallback)."""
+    return StreamingResponse(
+        _log_event_iter(request, after, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ── YouTube OAuth ──────────────────────────────────────────────────────
 
 
 @router.post("/api/youtube/config")
 async def api_save_youtube_config(request: Request):
     """Save YouTube OAuth client credentials."""
-    data = await request.json()
+    data = await _read_json(request)
     client_id = data.get("client_id", "").strip()
     client_secret = data.get("client_secret", "").strip()
     if not client_id or not client_secret:
-        return JSONResponse(status_code=400, content={"error": "Both client_id and client_secret required"})
-
-    settings = settings_store.get_settings()
-    settings["api_keys"]["youtube_oauth"] = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-    }
-    settings_store._write_settings(settings)
+        return ORJSONResponse(status_code=400, content={"error": "Both client_id and client_secret required"})
+
+    # Update in place so other youtube_oauth options (e.g. chunk_size) survive
+    await asyncio.to_thread(
+        settings_store.mutate_settings,
+        lambda settings: settings["api_keys"].setdefault("youtube_oauth", {}).update({
+            "client_id": client_id,
+            "client_secret": client_secret,
+        }),
+    )
     return {"ok": True}
 
 
@@ -423,25 +542,22 @@ async def api_get_youtube_config():
 @router.get("/api/youtube/auth/{channel_slug}")
 async def api_youtube_auth(channel_slug: str, request: Request):
     """Redirect to Google OAuth consent for a channel."""
-    from app.services.youtube_uploader import get_auth_url
 
     base_url = str(request.base_url).rstrip("/")
     redirect_uri = f"{base_url}/api/youtube/callback"
 
     auth_url = get_auth_url(channel_slug, redirect_uri)
     if not auth_url:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"error": "YouTube OAuth not configured. Add client ID and secret first."},
         )
-    from starlette.responses import RedirectResponse
     return RedirectResponse(url=auth_url)
 
 
 @router.get("/api/youtube/callback")
 async def api_youtube_callback(request: Request):
     """Handle OAuth callback from Google."""
-    from app.services.youtube_uploader import handle_callback
 
     code = request.query_params.get("code")
     channel_slug = request.query_params.get("state")
@@ -452,7 +568,8 @@ async def api_youtube_callback(request: Request):
     base_url = str(request.base_url).rstrip("/")
     redirect_uri = f"{base_url}/api/youtube/callback"
 
-    success = handle_callback(code, channel_slug, redirect_uri)
+    # Token exchange is a blocking HTTP call followed by a settings write
+    success = await asyncio.to_thread(handle_callback, code, channel_slug, redirect_uri)
     if success:
         return HTMLResponse(
             f"<h2>✅ YouTube connected for channel: {channel_slug}</h2>"
@@ -465,15 +582,20 @@ async def api_youtube_callback(request: Request):
 @router.get("/api/youtube/status/{channel_slug}")
 async def api_youtube_status(channel_slug: str):
     """Check if a channel is connected to YouTube."""
-    from app.services.youtube_uploader import is_channel_connected
     return {"connected": is_channel_connected(channel_slug)}
 
 
 # ── Helpers ────────────────────────────────────────────────────────────
 
 
+# Bullet runs for masking, sliced instead of rebuilt per key
+_BULLETS = "•" * 128
+
+
 def _mask_key(key: str) -> str:
     """Mask an API key for display: show first 4 and last 4 chars."""
-    if len(key) <= 8:
-        return "••••••••"
-    return f"{key[:4]}{'•' * (len(key) - 8)}{key[-4:]}"
+    n = len(key) - 8
+    if n <= 0:
+        return _BULLETS[:8]
+    middle = _BULLETS[:n] if n <= len(_BULLETS) else "•" * n
+    return f"{key[:4]}{middle}{key[-4:]}"
@@ -79,10 +79,11 @@ def main():
             print(f"  Then run: python install.py")
             sys.exit(1)
 
-        subprocess.run(
+        # PowerShell writes straight to our console; just hand back its exit code
+        result = subprocess.run(
             ["powershell", "-ExecutionPolicy", "Bypass", "-File", script],
-            check=True,
         )
+        sys.exit(result.returncode)
 
     elif os_name == "darwin":
         print("  🍎 macOS detected.")
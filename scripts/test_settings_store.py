@@ -0,0 +1,41 @@
+"""
+Quick test of channel slug handling in settings_store (uses a temp data dir).
+Run from the project root: python scripts/test_settings_store.py
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import settings_store
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        settings_store.DATA_DIR = tmp
+        settings_store.SETTINGS_FILE = tmp / "settings.json"
+        settings_store.CHANNELS_DIR = tmp / "channels"
+        settings_store._cache = None
+
+        # A channel entry without a slug must not break duplicate-slug handling
+        data = {**settings_store.DEFAULT_SETTINGS, "channels": [
+            {"name": "No Slug"},
+            {**settings_store.DEFAULT_CHANNEL, "name": "Facts", "slug": "facts"},
+        ]}
+        settings_store.save_settings(data)
+
+        ch = settings_store.add_channel({"name": "Facts"})
+        assert ch["slug"] == "facts_2", ch["slug"]
+        ch = settings_store.add_channel({"name": "Facts"})
+        assert ch["slug"] == "facts_3", ch["slug"]
+        print("  duplicate names with a slug-less entry -> facts_2, facts_3")
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,20 @@ Run from the project root: python scripts/test_svg_builder.py
 """
 import sys
 import os
+import copy
 import io
-import xml.etree.ElementTree as ET
+
+from lxml import etree as ET
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.card_builder_svg import (
     _find_by_id, _inject_text, _inject_image, _inject_source,
-    _resize_svg, _svg_dims, SVG_NS, XLINK_NS,
+    _resize_svg, _svg_dims, _parse_template,
     TEXT_TO_IMAGE_GAP, IMAGE_TO_SOURCE_GAP, BOTTOM_PADDING,
 )
 
-ET.register_namespace("", SVG_NS)
-ET.register_namespace("xlink", XLINK_NS)
-
 
 def main():
     svg_path = os.path.join("assets", "channels", "test_channel", "template.svg")
@@ -26,8 +25,8 @@ def main():
         print(f"ERROR: Template not found at {svg_path}")
         return
 
-    svg_raw = open(svg_path, "r", encoding="utf-8").read()
-    root = ET.fromstring(svg_raw)
+    template = _parse_template(svg_path, os.stat(svg_path).st_mtime_ns)
+    root = copy.deepcopy(template)
 
     svg_w, original_h = _svg_dims(root)
     print(f"Original SVG: {svg_w}×{original_h}")
@@ -42,11 +41,11 @@ def main():
     print(f"  source found: {source_el is not None} (tag: {source_el.tag if source_el is not None else 'N/A'})")
 
     if image_el is not None:
-        tag_local = image_el.tag.split("}")[-1] if "}" in image_el.tag else image_el.tag
+        tag_local = ET.QName(image_el).localname
         print(f"  main_image type: {tag_local}")
         if tag_local == "g":
             for child in image_el:
-                child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
+                child_tag = ET.QName(child).localname
                 print(f"    child: <{child_tag}> fill={child.get('fill', 'N/A')}")
 
     # ── Test 1: Text injection ──
@@ -57,12 +56,11 @@ def main():
     text_bottom = text_info["start_y"] + text_info["text_height"]
     print(f"  Text bottom: {text_bottom:.0f}px")
 
-    # Verify tspan elements were created
-    text_el = _find_by_id(root, "input_text")
+    # Verify tspan elements were created (text_el was modified in place)
     tspans = list(text_el)
     print(f"  <tspan> elements created: {len(tspans)}")
     for i, ts in enumerate(tspans):
-        ts_tag = ts.tag.split("}")[-1] if "}" in ts.tag else ts.tag
+        ts_tag = ET.QName(ts).localname
         print(f"    [{i}] <{ts_tag}> x={ts.get('x')} y={ts.get('y', 'N/A')} dy={ts.get('dy', 'N/A')} text='{ts.text}'")
 
     # ── Test 2: Image injection (with test image) ──
@@ -82,8 +80,7 @@ def main():
     # ── Test 3: Source injection ──
     print("\n=== Test 3: Source Injection ===")
     source_y = image_bottom + IMAGE_TO_SOURCE_GAP
-    _inject_source(root, "source: reddit.com", source_y, x=text_info["x"])
-    source_el = _find_by_id(root, "source")
+    source_el = _inject_source(root, "source: reddit.com", source_y, x=text_info["x"])
     source_children = list(source_el)
     print(f"  Source tspan count: {len(source_children)}")
     if source_children:
@@ -102,14 +99,13 @@ def main():
     # ── Save the manipulated SVG for visual inspection ──
     out_svg = os.path.join("output", "test_manipulated.svg")
     os.makedirs("output", exist_ok=True)
-    svg_str = ET.tostring(root, encoding="unicode", xml_declaration=True)
-    with open(out_svg, "w", encoding="utf-8") as f:
-        f.write(svg_str)
+    with open(out_svg, "wb") as f:
+        f.write(ET.tostring(root, encoding="utf-8", xml_declaration=True))
     print(f"\n  Manipulated SVG saved to: {out_svg}")
 
     # ── Test 5: No-image test ──
     print("\n=== Test 5: No Image Test ===")
-    root2 = ET.fromstring(open(svg_path, "r", encoding="utf-8").read())
+    root2 = copy.deepcopy(template)
     text_info2 = _inject_text(root2, "Short text only.", svg_w)
     text_bottom2 = text_info2["start_y"] + text_info2["text_height"]
     image_y2 = text_bottom2 + TEXT_TO_IMAGE_GAP
@@ -122,9 +118,8 @@ def main():
     print(f"  Final SVG: {svg_w}×{new_h2}")
 
     out_svg2 = os.path.join("output", "test_no_image.svg")
-    svg_str2 = ET.tostring(root2, encoding="unicode", xml_declaration=True)
-    with open(out_svg2, "w", encoding="utf-8") as f:
-        f.write(svg_str2)
+    with open(out_svg2, "wb") as f:
+        f.write(ET.tostring(root2, encoding="utf-8", xml_declaration=True))
     print(f"  Saved to: {out_svg2}")
 
     print("\nAll SVG manipulation tests PASSED!")
@@ -1,30 +1,58 @@
-import urllib.request
-import json
-import ssl
-
-ssl._create_default_https_context = ssl._create_unverified_context
+import asyncio
+import aiohttp
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
     'Accept-Language': 'en-US,en;q=0.9',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1'
 }
 
 urls = [
+    # Reddit endpoints
     'https://www.reddit.com/r/UnresolvedMysteries/hot.json',
     'https://old.reddit.com/r/UnresolvedMysteries/hot.json',
     'https://api.reddit.com/r/UnresolvedMysteries/hot.json',
-    'https://www.reddit.com/r/UnresolvedMysteries.rss'
+    'https://www.reddit.com/r/UnresolvedMysteries.rss',
+    # Redlib / libreddit mirrors
+    'https://l.opnxng.com/r/AskReddit.json',
+    'https://redlib.ducks.party/r/AskReddit.json',
+    'https://libreddit.freedit.eu/r/AskReddit.json',
+    'https://libreddit.pussthecat.org/r/AskReddit.json',
+    'https://reddit.rtrace.io/r/AskReddit.json',
 ]
 
-for url in urls:
-    print(f"Testing {url}...")
-    req = urllib.request.Request(url, headers=headers)
+
+async def probe(url, session):
+    """Fetch one URL, returning (status, content type, first bytes) or the error."""
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            print(f"Success! Status: {response.status}, Content-Type: {response.getheader('Content-Type')}")
-            data = response.read()
-            print(f"Preview: {data[:100]}")
+        async with session.get(url) as resp:
+            data = await resp.content.read(100)
+            return resp.status, resp.headers.get('Content-Type'), data
     except Exception as e:
-        print(f"Failed: {e}")
-    print("-" * 40)
+        return None, None, e
+
+
+async def main():
+    # All URLs are probed concurrently over one pooled session
+    connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(*[probe(url, session) for url in urls])
+
+    for url, (status, ctype, data) in zip(urls, results):
+        print(f"Testing {url}...")
+        if status is None:
+            print(f"Failed: {data}")
+        else:
+            print(f"Status: {status}, Content-Type: {ctype}")
+            print(f"Preview: {data}")
+        print("-" * 40)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())